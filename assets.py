@@ -0,0 +1,86 @@
+# assets.py
+"""Workstation assets (PCs, monitors, docks) hanging off room and faculty.
+
+Counts come from asset_room_count, which triggers keep per (room, type);
+rollups by floor, building or campus join it to room, so they cost a pass
+over rooms rather than over the asset table. Per-room listings use the
+(room_no, type_id) index.
+"""
+import csv
+import io
+from datetime import date
+
+STATUSES = {1: "In use", 2: "Spare", 3: "In repair", 4: "Retired"}
+
+INSERT_SQL = """INSERT INTO asset (asset_tag, type_id, room_no, faculty_id, status, registered_on)
+                VALUES (%s,%s,%s,%s,%s,%s)"""
+
+# level -> (columns selected/grouped, joins)
+_ROLLUP_LEVELS = {
+    "room": ("r.room_no AS room_no, r.location AS location", ""),
+    "floor": ("f.floor_no AS floor_no, f.floor_name AS floor_name",
+              "JOIN floor f ON r.floor_no = f.floor_no"),
+    "building": ("b.building_id AS building_id, b.build_name AS build_name",
+                 "JOIN building b ON r.building_id = b.building_id"),
+    "campus": ("c.campus_id AS campus_id, c.campus_name AS campus_name",
+               "JOIN campus c ON r.campus_id = c.campus_id"),
+}
+ROLLUP_LEVELS = list(_ROLLUP_LEVELS.keys())
+
+
+def rollup_query(level, room_where="1=1"):
+    """Asset counts per type at the given level, restricted by a room predicate on alias r."""
+    cols, joins = _ROLLUP_LEVELS[level]
+    group_cols = ", ".join(c.split(" AS ")[0] for c in cols.split(", "))
+    return f"""
+        SELECT {cols}, t.type_name, SUM(arc.asset_count) AS assets
+        FROM asset_room_count arc
+        JOIN room r ON arc.room_no = r.room_no
+        JOIN asset_type t ON arc.type_id = t.type_id
+        {joins}
+        WHERE arc.asset_count > 0 AND {room_where}
+        GROUP BY {group_cols}, t.type_name
+        ORDER BY {group_cols}, t.type_name
+    """
+
+
+ROOM_ASSETS_SQL = """
+    SELECT a.asset_id, a.asset_tag, t.type_name, a.status, a.faculty_id, a.registered_on
+    FROM asset a
+    JOIN asset_type t ON a.type_id = t.type_id
+    WHERE a.room_no = %s
+    ORDER BY a.type_id, a.asset_tag
+"""
+
+
+def parse_asset_csv(data, type_ids):
+    """Rows for INSERT_SQL from CSV with asset_tag, type[, room_no, faculty_id, status].
+
+    type may be a type name or id. Returns (rows, errors) with errors as (line_no, message).
+    """
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig")
+    by_name = {name.lower(): tid for name, tid in type_ids.items()}
+    today = date.today()
+    rows, errors, seen = [], [], set()
+    for line_no, rec in enumerate(csv.DictReader(io.StringIO(data)), start=2):
+        tag = (rec.get("asset_tag") or "").strip()
+        type_val = (rec.get("type") or "").strip()
+        type_id = int(type_val) if type_val.isdigit() else by_name.get(type_val.lower())
+        if not tag:
+            errors.append((line_no, "missing asset_tag"))
+        elif tag in seen:
+            errors.append((line_no, f"duplicate asset_tag {tag}"))
+        elif type_id is None:
+            errors.append((line_no, f"unknown type {type_val!r}"))
+        else:
+            try:
+                room_no = int(rec["room_no"]) if (rec.get("room_no") or "").strip() else None
+                faculty_id = int(rec["faculty_id"]) if (rec.get("faculty_id") or "").strip() else None
+                status = int(rec["status"]) if (rec.get("status") or "").strip() else 1
+            except ValueError as e:
+                errors.append((line_no, f"invalid number: {e}"))
+                continue
+            seen.add(tag)
+            rows.append((tag, type_id, room_no, faculty_id, status, today))
+    return rows, errors
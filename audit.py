@@ -0,0 +1,268 @@
+# audit.py
+"""Audit events for writes issued by the app.
+
+capture() runs on the session's connection just before a write and reads
+the before-image of the affected rows with a locking read (FOR UPDATE).
+A locking read sees the latest committed rows rather than the session's
+REPEATABLE READ snapshot, which may be long-lived, and keeps them locked
+until the write commits, so the image is what the write changes. The event
+is then handed to AuditWriter, which buffers events in memory and inserts
+them in batches from a background thread, so an admin action only pays for
+the before-image read.
+
+Bulk paths that write through their own connection (booking imports,
+consistency repairs, snapshot imports) record one summary event each with
+record_now(), on that connection, right after they commit.
+"""
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from datetime import date, datetime
+
+log = logging.getLogger("uwms.audit")
+
+ENABLED = os.environ.get("UWMS_AUDIT", "1") != "0"
+
+MAX_BEFORE_ROWS = 200
+MAX_STATEMENT_LEN = 1000
+
+_UPDATE_RE = re.compile(r"^\s*UPDATE\s+(?P<refs>.+?)\s+SET\s+(?P<set>.+?)(?:\s+WHERE\s+(?P<where>.+))?$",
+                        re.IGNORECASE | re.DOTALL)
+_DELETE_RE = re.compile(r"^\s*DELETE\s+FROM\s+(?P<table>\w+)(?:\s+WHERE\s+(?P<where>.+))?$",
+                        re.IGNORECASE | re.DOTALL)
+_INSERT_RE = re.compile(r"^\s*INSERT\s+(?:IGNORE\s+)?INTO\s+(?P<table>\w+)\s*(?:\((?P<cols>[^)]*)\))?\s*VALUES",
+                        re.IGNORECASE | re.DOTALL)
+_TABLE_ALIAS_RE = re.compile(r"^\s*(?P<table>\w+)(?:\s+(?:AS\s+)?(?P<alias>(?!(?:JOIN|LEFT|RIGHT|INNER|CROSS|STRAIGHT_JOIN)\b)\w+))?", re.IGNORECASE)
+_WS_RE = re.compile(r"\s+")
+
+INSERT_SQL = """INSERT INTO audit_log
+                (event_time, username, action, table_name, statement, row_count, before_values, after_values)
+                VALUES (%s,%s,%s,%s,%s,%s,%s,%s)"""
+
+
+def _json(value):
+    if value is None:
+        return None
+
+    def default(o):
+        if isinstance(o, (datetime, date)):
+            return o.isoformat()
+        if isinstance(o, (bytes, bytearray)):
+            return int.from_bytes(o, "big") if len(o) <= 8 else o.hex()
+        return str(o)
+    return json.dumps(value, default=default)
+
+
+def _split_top_level(text, sep=","):
+    parts, depth, cur, quote = [], 0, [], None
+    for ch in text:
+        if quote:
+            cur.append(ch)
+            if ch == quote:
+                quote = None
+            continue
+        if ch in ("'", '"'):
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append("".join(cur))
+            cur = []
+            continue
+        cur.append(ch)
+    parts.append("".join(cur))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _assignments(set_clause, params):
+    """Map SET column -> new value (parameter value, or the SQL expression)."""
+    out = {}
+    params = list(params)
+    for part in _split_top_level(set_clause):
+        col, _, expr = part.partition("=")
+        col = col.strip().split(".")[-1]
+        expr = expr.strip()
+        n = expr.count("%s")
+        if expr == "%s":
+            out[col] = params.pop(0) if params else None
+        else:
+            del params[:n]
+            out[col] = expr
+    return out
+
+
+def capture(cursor, query, params):
+    """Describe a write before it runs. Returns a partial event dict or None.
+
+    For UPDATE/DELETE the affected rows are read with the statement's own
+    WHERE clause and parameters (at most MAX_BEFORE_ROWS are kept).
+    """
+    params = tuple(params or ())
+    m = _UPDATE_RE.match(query)
+    if m:
+        refs, set_clause, where = m.group("refs"), m.group("set"), m.group("where")
+        n_refs, n_set = refs.count("%s"), set_clause.count("%s")
+        ta = _TABLE_ALIAS_RE.match(refs)
+        table = ta.group("table").lower()
+        alias = ta.group("alias") or ta.group("table")
+        select = f"SELECT {alias}.* FROM {refs}" + (f" WHERE {where}" if where else "")
+        before = _before_image(cursor, select, params[:n_refs] + params[n_refs + n_set:])
+        return {"action": "UPDATE", "table_name": table, "before": before,
+                "after": _assignments(set_clause, params[n_refs:n_refs + n_set])}
+    m = _DELETE_RE.match(query)
+    if m:
+        table, where = m.group("table"), m.group("where")
+        select = f"SELECT * FROM {table}" + (f" WHERE {where}" if where else "")
+        return {"action": "DELETE", "table_name": table.lower(),
+                "before": _before_image(cursor, select, params), "after": None}
+    m = _INSERT_RE.match(query)
+    if m:
+        cols = [c.strip() for c in (m.group("cols") or "").split(",") if c.strip()]
+        after = dict(zip(cols, params)) if cols and len(cols) == len(params) else {"values": list(params)}
+        return {"action": "INSERT", "table_name": m.group("table").lower(), "before": None, "after": after}
+    return None
+
+
+def _before_image(cursor, select, params):
+    cursor.execute(select + f" LIMIT {MAX_BEFORE_ROWS + 1} FOR UPDATE", params)
+    rows = cursor.fetchall()
+    if rows and not isinstance(rows[0], dict):
+        cols = cursor.column_names
+        rows = [dict(zip(cols, r)) for r in rows]
+    if len(rows) > MAX_BEFORE_ROWS:
+        return {"rows": rows[:MAX_BEFORE_ROWS], "truncated": True}
+    return rows
+
+
+def make_event(partial, username, query, row_count):
+    """Final row tuple for audit_log."""
+    return (datetime.now(), username, partial["action"], partial["table_name"],
+            _WS_RE.sub(" ", query).strip()[:MAX_STATEMENT_LEN], row_count,
+            _json(partial["before"]), _json(partial["after"]))
+
+
+def procedure_event(proc_name, params, username, tables):
+    partial = {"action": "CALL", "table_name": ",".join(sorted(tables)) or None,
+               "before": None, "after": {"procedure": proc_name, "params": list(params or [])}}
+    return make_event(partial, username, f"CALL {proc_name}", None)
+
+
+def summary_event(action, table_name, username, statement, row_count, details=None):
+    """Event for a bulk write without a before-image; details go to after_values."""
+    partial = {"action": action, "table_name": table_name, "before": None, "after": details}
+    return make_event(partial, username, statement, row_count)
+
+
+def record_now(conn, event):
+    """Write one event at once on conn; a failure is logged, never raised."""
+    if not ENABLED:
+        return
+    try:
+        flush_events(conn, [event])
+    except Exception as e:
+        log.warning("audit event for %s not written: %s", event[3], e)
+
+
+def flush_events(conn, events):
+    """Insert a batch of events in one statement and commit."""
+    if not events:
+        return
+    cursor = conn.cursor()
+    try:
+        cursor.executemany(INSERT_SQL, events)
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+class AuditWriter:
+    """Buffers events and writes them in batches from a daemon thread."""
+
+    def __init__(self, connect, batch_size=200, flush_interval=1.0, max_buffer=50000):
+        self.connect = connect
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self.last_error = None
+        self._queue = queue.Queue(maxsize=max_buffer)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="uwms-audit", daemon=True)
+        self._partition_checked = None
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def enqueue(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            log.warning("audit buffer full, dropped event for %s", event[3])
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _take_batch(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        conn = None
+        batch = []
+        while not (self._stop.is_set() and not batch and self._queue.empty()):
+            if not batch:
+                batch = self._take_batch()
+            if not batch:
+                continue
+            try:
+                if conn is None or not conn.is_connected():
+                    conn = self.connect()
+                self._ensure_partition(conn)
+                flush_events(conn, batch)
+                self.written += len(batch)
+                self.last_error = None
+                batch = []
+            except Exception as e:
+                # keep the batch and retry after a pause
+                self.last_error = str(e)
+                log.warning("audit flush failed: %s", e)
+                conn = None
+                if self._stop.wait(5):
+                    break
+
+    def _ensure_partition(self, conn):
+        """Once a day, make sure next month's partition exists."""
+        today = date.today()
+        if self._partition_checked == today:
+            return
+        self._partition_checked = today
+        next_month = date(today.year + (today.month == 12), today.month % 12 + 1, 1)
+        cursor = conn.cursor()
+        try:
+            cursor.callproc("add_audit_partition", [next_month])
+            conn.commit()
+        except Exception as e:
+            log.warning("could not add audit partition for %s: %s", next_month, e)
+        finally:
+            cursor.close()
@@ -0,0 +1,201 @@
+# consistency.py
+"""Reconcile room.is_allotted with faculty.room_no.
+
+faculty.room_no is the source of truth: a room is allotted exactly when some
+faculty member points at it. The check is one grouped pass over room joined
+to faculty (via the faculty.room_no index); repairs are applied in batches
+with a commit per batch so long runs never hold large locks.
+
+Run from cron with:  python consistency.py [--repair] [--batch-size N]
+"""
+import argparse
+import logging
+import threading
+import time
+from datetime import datetime
+
+import audit
+
+log = logging.getLogger("uwms.consistency")
+
+DEFAULT_BATCH_SIZE = 500
+
+MISMATCH_SQL = """
+    SELECT r.room_no, r.is_allotted + 0 AS is_allotted, COUNT(f.faculty_id) AS holders
+    FROM room r
+    LEFT JOIN faculty f ON f.room_no = r.room_no
+    GROUP BY r.room_no, r.is_allotted
+    HAVING (is_allotted = 1 AND holders = 0)
+        OR (is_allotted = 0 AND holders > 0)
+        OR holders > 1
+"""
+
+
+def find_mismatches(conn, fetch_size=5000):
+    """Return a dict of room_no lists: allotted_unused, free_but_used, shared."""
+    result = {"allotted_unused": [], "free_but_used": [], "shared": []}
+    cursor = conn.cursor()
+    try:
+        cursor.execute(MISMATCH_SQL)
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            for room_no, is_allotted, holders in rows:
+                if is_allotted and holders == 0:
+                    result["allotted_unused"].append(room_no)
+                elif not is_allotted and holders > 0:
+                    result["free_but_used"].append(room_no)
+                if holders > 1:
+                    result["shared"].append(room_no)
+    finally:
+        cursor.close()
+    return result
+
+
+def count_rooms(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM room")
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def repair(conn, room_nos, batch_size=DEFAULT_BATCH_SIZE):
+    """Recompute is_allotted from faculty for the given rooms, one commit per batch.
+
+    Rooms shared by several faculty are only reported; picking who keeps the
+    room is an admin decision.
+    """
+    repaired = 0
+    cursor = conn.cursor()
+    try:
+        for start in range(0, len(room_nos), batch_size):
+            batch = room_nos[start:start + batch_size]
+            placeholders = ",".join(["%s"] * len(batch))
+            cursor.execute(f"""UPDATE room r
+                               SET r.is_allotted = EXISTS (SELECT 1 FROM faculty f WHERE f.room_no = r.room_no)
+                               WHERE r.room_no IN ({placeholders})""", tuple(batch))
+            repaired += cursor.rowcount
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return repaired
+
+
+def record_run(conn, summary):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""INSERT INTO consistency_run
+                          (started_at, finished_at, trigger_source, rooms_scanned,
+                           allotted_unused, free_but_used, shared_rooms, repaired)
+                          VALUES (%s,%s,%s,%s,%s,%s,%s,%s)""",
+                       (summary["started_at"], summary["finished_at"], summary["trigger_source"],
+                        summary["rooms_scanned"], len(summary["allotted_unused"]),
+                        len(summary["free_but_used"]), len(summary["shared"]), summary["repaired"]))
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def run_check(conn, do_repair=False, batch_size=DEFAULT_BATCH_SIZE, trigger_source="manual"):
+    """Check, optionally repair, and record the run. Returns the summary dict."""
+    started_at = datetime.now()
+    if conn.in_transaction:
+        conn.commit()
+    summary = find_mismatches(conn)
+    summary["rooms_scanned"] = count_rooms(conn)
+    summary["repaired"] = 0
+    if do_repair:
+        flagged = summary["allotted_unused"] + summary["free_but_used"]
+        summary["repaired"] = repair(conn, flagged, batch_size)
+        if summary["repaired"]:
+            audit.record_now(conn, audit.summary_event(
+                "UPDATE", "room", getattr(conn, "user", None), f"consistency repair ({trigger_source})",
+                summary["repaired"], {"is_allotted": "recomputed from faculty",
+                                      "rooms": list(flagged[:audit.MAX_BEFORE_ROWS])}))
+    summary["started_at"] = started_at
+    summary["finished_at"] = datetime.now()
+    summary["trigger_source"] = trigger_source
+    record_run(conn, summary)
+    return summary
+
+
+def recent_runs(conn, limit=20):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT * FROM consistency_run ORDER BY run_id DESC LIMIT %s", (limit,))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+class ConsistencyJob:
+    """Background thread that runs the check (and repair) on a fixed interval."""
+
+    def __init__(self, connect, interval, do_repair=True, batch_size=DEFAULT_BATCH_SIZE, on_repaired=None):
+        self.connect = connect
+        self.interval = interval
+        self.do_repair = do_repair
+        self.batch_size = batch_size
+        self.on_repaired = on_repaired
+        self.last_summary = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="uwms-consistency", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            conn = None
+            try:
+                conn = self.connect()
+                self.last_summary = run_check(conn, self.do_repair, self.batch_size, trigger_source="scheduled")
+                self.last_error = None
+                if self.last_summary["repaired"] and self.on_repaired:
+                    self.on_repaired()
+            except Exception as e:
+                self.last_error = str(e)
+                log.exception("scheduled consistency check failed")
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+
+def main():
+    from db import connect_service
+    parser = argparse.ArgumentParser(description="Check room.is_allotted against faculty.room_no")
+    parser.add_argument("--repair", action="store_true", help="fix flagged rooms")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    conn = connect_service()
+    if conn is None:
+        raise SystemExit("Set UWMS_SERVICE_USER and UWMS_SERVICE_PASSWORD")
+    start = time.perf_counter()
+    try:
+        summary = run_check(conn, args.repair, args.batch_size, trigger_source="cli")
+    finally:
+        conn.close()
+    print(f"rooms scanned: {summary['rooms_scanned']}")
+    print(f"allotted without faculty: {len(summary['allotted_unused'])}")
+    print(f"free but assigned: {len(summary['free_but_used'])}")
+    print(f"shared by several faculty: {len(summary['shared'])}")
+    print(f"repaired: {summary['repaired']}  ({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
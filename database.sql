@@ -336,6 +336,499 @@ END$$
 
 DELIMITER ;
 
+-- =======================================
+-- CONSISTENCY CHECKS
+-- =======================================
+
+-- One row per run of consistency.py (room.is_allotted vs faculty.room_no)
+CREATE TABLE consistency_run (
+    run_id INT AUTO_INCREMENT PRIMARY KEY,
+    started_at DATETIME NOT NULL,
+    finished_at DATETIME NOT NULL,
+    trigger_source VARCHAR(20) NOT NULL,
+    rooms_scanned INT NOT NULL,
+    allotted_unused INT NOT NULL,
+    free_but_used INT NOT NULL,
+    shared_rooms INT NOT NULL,
+    repaired INT NOT NULL
+);
+
+-- =======================================
+-- ROOM RESERVATIONS
+-- =======================================
+
+-- Time-bounded bookings of shared rooms; is_allotted stays the permanent allotment
+CREATE TABLE room_reservation (
+    reservation_id INT AUTO_INCREMENT PRIMARY KEY,
+    room_no INT NOT NULL,
+    start_time DATETIME NOT NULL,
+    end_time DATETIME NOT NULL,
+    purpose VARCHAR(100),
+    booked_by VARCHAR(60),
+    source VARCHAR(20) NOT NULL DEFAULT 'manual',
+    CONSTRAINT chk_reservation_span CHECK (end_time > start_time),
+    -- reservations.MAX_BOOKING_LEN; overlap queries rely on it as a lower bound
+    CONSTRAINT chk_reservation_length CHECK (end_time <= start_time + INTERVAL 24 HOUR),
+    CONSTRAINT fk_reservation_room FOREIGN KEY (room_no) REFERENCES room(room_no)
+        ON DELETE CASCADE ON UPDATE CASCADE,
+    INDEX idx_reservation_room_time (room_no, start_time, end_time),
+    INDEX idx_reservation_time (start_time, end_time)
+);
+
+-- =======================================
+-- ROLES AND DATA SCOPE
+-- =======================================
+
+-- Role and visible slice per MySQL user. A dept_head row names a dept_id,
+-- a facility_manager row a campus_id; several rows widen the scope.
+-- Users without rows keep the default: 'admin' is admin, others read everything.
+-- Deleting a department or campus keeps the row with a NULL id; a dept_head or
+-- facility_manager left with no ids sees nothing rather than everything.
+-- Every app account needs SELECT on this table: login is refused if it can't be read.
+CREATE TABLE user_scope (
+    scope_id INT AUTO_INCREMENT PRIMARY KEY,
+    username VARCHAR(32) NOT NULL,
+    role VARCHAR(20) NOT NULL,
+    dept_id INT,
+    campus_id INT,
+    CONSTRAINT fk_scope_dept FOREIGN KEY (dept_id) REFERENCES department(dept_id) ON DELETE SET NULL,
+    CONSTRAINT fk_scope_campus FOREIGN KEY (campus_id) REFERENCES campus(campus_id) ON DELETE SET NULL,
+    INDEX idx_scope_user (username)
+);
+
+-- Indexes behind the scoped dashboard and listing queries
+CREATE INDEX idx_room_campus_allotted ON room (campus_id, is_allotted);
+CREATE INDEX idx_floor_dept ON floor (dept_id, floor_no);
+CREATE INDEX idx_floor_campus_dept ON floor (campus_id, dept_id);
+CREATE INDEX idx_faculty_dept_room ON faculty (dept_id, room_no);
+
+-- =======================================
+-- AUDIT LOG
+-- =======================================
+
+-- Every write issued by the app (who, what, before/after, when), written in
+-- batches by audit.AuditWriter. Partitioned by month so time-bounded queries
+-- only touch the months they ask for; the primary key must include event_time.
+CREATE TABLE audit_log (
+    audit_id BIGINT NOT NULL AUTO_INCREMENT,
+    event_time DATETIME(3) NOT NULL,
+    username VARCHAR(32),
+    action VARCHAR(10) NOT NULL,
+    table_name VARCHAR(64),
+    statement VARCHAR(1000),
+    row_count INT,
+    before_values JSON,
+    after_values JSON,
+    PRIMARY KEY (audit_id, event_time),
+    INDEX idx_audit_time (event_time),
+    INDEX idx_audit_table_time (table_name, event_time),
+    INDEX idx_audit_user_time (username, event_time)
+)
+PARTITION BY RANGE COLUMNS (event_time) (
+    PARTITION p2026_01 VALUES LESS THAN ('2026-02-01'),
+    PARTITION p2026_02 VALUES LESS THAN ('2026-03-01'),
+    PARTITION p2026_03 VALUES LESS THAN ('2026-04-01'),
+    PARTITION p2026_04 VALUES LESS THAN ('2026-05-01'),
+    PARTITION p2026_05 VALUES LESS THAN ('2026-06-01'),
+    PARTITION p2026_06 VALUES LESS THAN ('2026-07-01'),
+    PARTITION p2026_07 VALUES LESS THAN ('2026-08-01'),
+    PARTITION p2026_08 VALUES LESS THAN ('2026-09-01'),
+    PARTITION p2026_09 VALUES LESS THAN ('2026-10-01'),
+    PARTITION p2026_10 VALUES LESS THAN ('2026-11-01'),
+    PARTITION p2026_11 VALUES LESS THAN ('2026-12-01'),
+    PARTITION p2026_12 VALUES LESS THAN ('2027-01-01'),
+    PARTITION p2027_01 VALUES LESS THAN ('2027-02-01'),
+    PARTITION p2027_02 VALUES LESS THAN ('2027-03-01'),
+    PARTITION p2027_03 VALUES LESS THAN ('2027-04-01'),
+    PARTITION p2027_04 VALUES LESS THAN ('2027-05-01'),
+    PARTITION p2027_05 VALUES LESS THAN ('2027-06-01'),
+    PARTITION p2027_06 VALUES LESS THAN ('2027-07-01'),
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+
+DELIMITER $$
+
+-- Split pmax so month_start gets its own partition; called daily by the audit writer
+CREATE PROCEDURE add_audit_partition(IN month_start DATE)
+BEGIN
+    DECLARE pname VARCHAR(16);
+    SET pname = DATE_FORMAT(month_start, 'p%Y_%m');
+    IF NOT EXISTS (SELECT 1 FROM information_schema.partitions
+                   WHERE table_schema = DATABASE()
+                     AND table_name = 'audit_log'
+                     AND partition_name = pname) THEN
+        SET @ddl = CONCAT('ALTER TABLE audit_log REORGANIZE PARTITION pmax INTO (',
+                          'PARTITION ', pname, ' VALUES LESS THAN (''',
+                          DATE_ADD(month_start, INTERVAL 1 MONTH), '''), ',
+                          'PARTITION pmax VALUES LESS THAN (MAXVALUE))');
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END$$
+
+DELIMITER ;
+
+-- =======================================
+-- ASSET TRACKING
+-- =======================================
+
+CREATE TABLE asset_type (
+    type_id TINYINT UNSIGNED PRIMARY KEY,
+    type_name VARCHAR(30) NOT NULL UNIQUE
+);
+
+INSERT INTO asset_type VALUES
+(1, 'PC'),
+(2, 'Monitor'),
+(3, 'Docking Station'),
+(4, 'Laptop'),
+(5, 'Printer'),
+(6, 'Other');
+
+-- Narrow rows (tiny type/status codes) so hundreds of thousands fit in few pages.
+-- status: 1 in use, 2 spare, 3 in repair, 4 retired
+CREATE TABLE asset (
+    asset_id INT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    asset_tag VARCHAR(20) NOT NULL,
+    type_id TINYINT UNSIGNED NOT NULL,
+    room_no INT,
+    faculty_id INT,
+    status TINYINT UNSIGNED NOT NULL DEFAULT 1,
+    registered_on DATE NOT NULL,
+    UNIQUE KEY uq_asset_tag (asset_tag),
+    INDEX idx_asset_room_type (room_no, type_id),
+    INDEX idx_asset_faculty (faculty_id),
+    CONSTRAINT fk_asset_type FOREIGN KEY (type_id) REFERENCES asset_type(type_id),
+    CONSTRAINT fk_asset_room FOREIGN KEY (room_no) REFERENCES room(room_no) ON UPDATE CASCADE,
+    CONSTRAINT fk_asset_faculty FOREIGN KEY (faculty_id) REFERENCES faculty(faculty_id)
+);
+
+-- Per-room, per-type counts kept by triggers; floor/building/campus rollups
+-- join this to room instead of scanning asset.
+CREATE TABLE asset_room_count (
+    room_no INT NOT NULL,
+    type_id TINYINT UNSIGNED NOT NULL,
+    asset_count INT UNSIGNED NOT NULL,
+    PRIMARY KEY (room_no, type_id)
+);
+
+DELIMITER $$
+
+CREATE TRIGGER trg_asset_insert
+AFTER INSERT ON asset
+FOR EACH ROW
+BEGIN
+    IF NEW.room_no IS NOT NULL THEN
+        INSERT INTO asset_room_count VALUES (NEW.room_no, NEW.type_id, 1)
+        ON DUPLICATE KEY UPDATE asset_count = asset_count + 1;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_asset_delete
+AFTER DELETE ON asset
+FOR EACH ROW
+BEGIN
+    IF OLD.room_no IS NOT NULL THEN
+        UPDATE asset_room_count SET asset_count = asset_count - 1
+        WHERE room_no = OLD.room_no AND type_id = OLD.type_id;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_asset_update
+AFTER UPDATE ON asset
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.room_no <=> NEW.room_no) OR OLD.type_id <> NEW.type_id THEN
+        IF OLD.room_no IS NOT NULL THEN
+            UPDATE asset_room_count SET asset_count = asset_count - 1
+            WHERE room_no = OLD.room_no AND type_id = OLD.type_id;
+        END IF;
+        IF NEW.room_no IS NOT NULL THEN
+            INSERT INTO asset_room_count VALUES (NEW.room_no, NEW.type_id, 1)
+            ON DUPLICATE KEY UPDATE asset_count = asset_count + 1;
+        END IF;
+    END IF;
+END$$
+
+-- Assets issued to a faculty member follow them to a new room; releasing the
+-- room (room_no NULL) leaves them where they physically are.
+CREATE TRIGGER trg_faculty_assets_follow
+AFTER UPDATE ON faculty
+FOR EACH ROW
+FOLLOWS trg_faculty_room_update
+BEGIN
+    IF NEW.room_no IS NOT NULL AND NOT (OLD.room_no <=> NEW.room_no) THEN
+        UPDATE asset SET room_no = NEW.room_no WHERE faculty_id = NEW.faculty_id;
+    END IF;
+END$$
+
+-- Renumbering a room cascades to asset.room_no, but cascaded changes don't
+-- fire trg_asset_update, so move the room's counts here. No asset can point
+-- at the new number yet, so rows left there are stale zeros.
+CREATE TRIGGER trg_room_renumber_assets
+AFTER UPDATE ON room
+FOR EACH ROW
+BEGIN
+    IF OLD.room_no <> NEW.room_no THEN
+        DELETE FROM asset_room_count WHERE room_no = NEW.room_no;
+        UPDATE asset_room_count SET room_no = NEW.room_no WHERE room_no = OLD.room_no;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_faculty_release_assets
+BEFORE DELETE ON faculty
+FOR EACH ROW
+BEGIN
+    UPDATE asset SET faculty_id = NULL WHERE faculty_id = OLD.faculty_id;
+END$$
+
+CREATE TRIGGER trg_room_release_assets
+BEFORE DELETE ON room
+FOR EACH ROW
+BEGIN
+    UPDATE asset SET room_no = NULL WHERE room_no = OLD.room_no;
+END$$
+
+DELIMITER ;
+
+-- =======================================
+-- CHANGE LOG (local read replicas, replica.py)
+-- =======================================
+
+-- One row per inserted/updated/deleted row of the mirrored tables. Replicas
+-- pull rows past their watermark; table_name '*' asks them to reload in full.
+-- Sessions that set @uwms_skip_change_log (snapshot import) write no entries.
+CREATE TABLE change_log (
+    change_id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    table_name VARCHAR(20) NOT NULL,
+    row_id INT NOT NULL,
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_change_log_time (changed_at)
+);
+
+DELIMITER $$
+
+CREATE TRIGGER trg_campus_log_insert
+AFTER INSERT ON campus
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('campus', NEW.campus_id);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_campus_log_update
+AFTER UPDATE ON campus
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('campus', NEW.campus_id);
+        IF OLD.campus_id <> NEW.campus_id THEN
+            INSERT INTO change_log (table_name, row_id) VALUES ('campus', OLD.campus_id);
+        END IF;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_campus_log_delete
+AFTER DELETE ON campus
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('campus', OLD.campus_id);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_block_log_insert
+AFTER INSERT ON block
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('block', NEW.block_id);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_block_log_update
+AFTER UPDATE ON block
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('block', NEW.block_id);
+        IF OLD.block_id <> NEW.block_id THEN
+            INSERT INTO change_log (table_name, row_id) VALUES ('block', OLD.block_id);
+        END IF;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_block_log_delete
+AFTER DELETE ON block
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('block', OLD.block_id);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_building_log_insert
+AFTER INSERT ON building
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('building', NEW.building_id);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_building_log_update
+AFTER UPDATE ON building
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('building', NEW.building_id);
+        IF OLD.building_id <> NEW.building_id THEN
+            INSERT INTO change_log (table_name, row_id) VALUES ('building', OLD.building_id);
+        END IF;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_building_log_delete
+AFTER DELETE ON building
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('building', OLD.building_id);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_department_log_insert
+AFTER INSERT ON department
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('department', NEW.dept_id);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_department_log_update
+AFTER UPDATE ON department
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('department', NEW.dept_id);
+        IF OLD.dept_id <> NEW.dept_id THEN
+            INSERT INTO change_log (table_name, row_id) VALUES ('department', OLD.dept_id);
+        END IF;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_department_log_delete
+AFTER DELETE ON department
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('department', OLD.dept_id);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_floor_log_insert
+AFTER INSERT ON floor
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('floor', NEW.floor_no);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_floor_log_update
+AFTER UPDATE ON floor
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('floor', NEW.floor_no);
+        IF OLD.floor_no <> NEW.floor_no THEN
+            INSERT INTO change_log (table_name, row_id) VALUES ('floor', OLD.floor_no);
+        END IF;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_floor_log_delete
+AFTER DELETE ON floor
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('floor', OLD.floor_no);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_room_log_insert
+AFTER INSERT ON room
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('room', NEW.room_no);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_room_log_update
+AFTER UPDATE ON room
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('room', NEW.room_no);
+        IF OLD.room_no <> NEW.room_no THEN
+            INSERT INTO change_log (table_name, row_id) VALUES ('room', OLD.room_no);
+        END IF;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_room_log_delete
+AFTER DELETE ON room
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('room', OLD.room_no);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_faculty_log_insert
+AFTER INSERT ON faculty
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('faculty', NEW.faculty_id);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_faculty_log_update
+AFTER UPDATE ON faculty
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('faculty', NEW.faculty_id);
+        IF OLD.faculty_id <> NEW.faculty_id THEN
+            INSERT INTO change_log (table_name, row_id) VALUES ('faculty', OLD.faculty_id);
+        END IF;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_faculty_log_delete
+AFTER DELETE ON faculty
+FOR EACH ROW
+BEGIN
+    IF @uwms_skip_change_log IS NULL THEN
+        INSERT INTO change_log (table_name, row_id) VALUES ('faculty', OLD.faculty_id);
+    END IF;
+END$$
+
+DELIMITER ;
+
+-- The triggers above write whether or not any replica is running, so the log
+-- is pruned by MySQL itself, not by the app: rows older than
+-- replica.RETENTION_DAYS are deleted hourly. Needs event_scheduler=ON (the
+-- MySQL 8 default).
+CREATE EVENT ev_prune_change_log
+ON SCHEDULE EVERY 1 HOUR
+DO DELETE FROM change_log WHERE changed_at < NOW() - INTERVAL 7 DAY;
+
 -- =======================================
 -- END OF FILE
 -- =======================================
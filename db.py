@@ -0,0 +1,366 @@
+# db.py
+import os
+
+import streamlit as st
+
+import audit
+import query_cache
+
+AUDIT_ENABLED = audit.ENABLED
+ER_TABLEACCESS_DENIED = 1142
+ER_COLUMNACCESS_DENIED = 1143
+# Events a session buffers without a background writer (see flush_session_audit)
+MAX_SESSION_AUDIT_EVENTS = 500
+
+# mysql.connector is imported inside the helpers so the login page and
+# reruns that never touch the database don't pay for it at startup.
+
+# -------------------------
+# DB helpers
+# -------------------------
+def connect_with_credentials(username: str, password: str):
+    """Connect to MySQL using provided credentials."""
+    import mysql.connector
+    conn = mysql.connector.connect(
+        host="localhost",
+        database="university_workstation",
+        user=username,
+        password=password,
+        auth_plugin='mysql_native_password'
+    )
+    return conn
+
+
+def connect_service():
+    """Connection for background jobs, from UWMS_SERVICE_USER/UWMS_SERVICE_PASSWORD.
+
+    Returns None when no service account is configured.
+    """
+    user = os.environ.get("UWMS_SERVICE_USER")
+    if not user:
+        return None
+    return connect_with_credentials(user, os.environ.get("UWMS_SERVICE_PASSWORD", ""))
+
+
+def show_db_error(e: Exception):
+    """Show DB error detail for admins, generic for other roles."""
+    if st.session_state.get("role") == "admin":
+        st.error(f"DB error: {e}")
+    else:
+        st.error("Database operation failed (insufficient privileges or error).")
+
+
+@st.cache_resource
+def get_query_cache():
+    """Process-wide result cache shared by every session."""
+    return query_cache.cache_from_env()
+
+
+@st.cache_resource
+def get_replica():
+    """Local read replica from UWMS_REPLICA_DB; None when the mode is off."""
+    path = os.environ.get("UWMS_REPLICA_DB")
+    if not path:
+        return None
+    import replica
+    return replica.Replica(path)
+
+
+def _replica_for(query):
+    """The replica if it can answer this read for this session, else None."""
+    replica = get_replica()
+    if replica is None or not replica.ready:
+        return None
+    # after a write, wait for a sync pass that started after it (read-your-writes)
+    if st.session_state.get("_replica_wait", 0) > replica.completed:
+        return None
+    if not replica.covers(query_cache.tables_read(query)):
+        return None
+    return replica if _replica_allowed() else None
+
+
+def _replica_allowed():
+    """Whether this session's MySQL account may SELECT every mirrored table.
+
+    The replica is filled by the service account, so it must not answer for
+    accounts with narrower grants. Probed once per session on the session's
+    own connection; undecided (and retried) while MySQL can't be asked.
+    """
+    allowed = st.session_state.get("_replica_allowed")
+    if allowed is not None:
+        return allowed
+    from mysql.connector import Error
+    import replica
+    conn = st.session_state.get("db_conn")
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        # LIMIT 0 reads no rows but still checks SELECT on every table and column
+        cursor.execute(f"SELECT * FROM {', '.join(replica.TABLES)} LIMIT 0")
+        cursor.fetchall()
+        count_queries()
+        allowed = True
+    except Error as e:
+        if e.errno not in (ER_TABLEACCESS_DENIED, ER_COLUMNACCESS_DENIED):
+            return False
+        allowed = False
+    finally:
+        if cursor:
+            cursor.close()
+    st.session_state["_replica_allowed"] = allowed
+    return allowed
+
+
+def _replica_written(tables):
+    """Note a committed write so this session reads it back from the primary until synced."""
+    replica = get_replica()
+    if replica is None or not tables:
+        return
+    st.session_state["_replica_wait"] = replica.started + 1
+    replica.request_sync()
+
+
+@st.cache_resource
+def get_audit_writer():
+    """Background audit writer; None without a service account."""
+    if not AUDIT_ENABLED or not os.environ.get("UWMS_SERVICE_USER"):
+        return None
+    return audit.AuditWriter(connect_service).start()
+
+
+def count_queries(n=1):
+    """Add to this session's count of statements sent to MySQL (cache hits excluded)."""
+    st.session_state["_query_count"] = st.session_state.get("_query_count", 0) + n
+
+
+def _capture_audit(cursor, query, params):
+    """Before-image for a write; auditing problems never block the write itself."""
+    from mysql.connector import Error
+    if not AUDIT_ENABLED:
+        return None
+    try:
+        partial = audit.capture(cursor, query, params)
+        if partial and partial["action"] in ("UPDATE", "DELETE"):
+            count_queries()  # before-image read
+        return partial
+    except Error:
+        return {"action": query.split(None, 1)[0].upper(), "table_name": None, "before": None, "after": None}
+
+
+def _queue_audit(event):
+    writer = get_audit_writer()
+    if writer is not None:
+        writer.enqueue(event)
+        return
+    pending = st.session_state.setdefault("_audit_pending", [])
+    if len(pending) >= MAX_SESSION_AUDIT_EVENTS:
+        # flushing keeps failing (e.g. no INSERT on audit_log); stay bounded
+        dropped = pending.pop(0)
+        audit.log.warning("session audit buffer full, dropped event for %s", dropped[3])
+    pending.append(event)
+
+
+def flush_session_audit():
+    """Write events buffered by this session when no background writer runs."""
+    events = st.session_state.get("_audit_pending")
+    conn = st.session_state.get("db_conn")
+    if not events or conn is None:
+        return
+    from mysql.connector import Error
+    try:
+        audit.flush_events(conn, events)
+        count_queries()
+        st.session_state["_audit_pending"] = []
+    except Error:
+        pass  # kept for the next rerun
+
+
+def execute_query(query, params=None, fetch=True, cached=False, ttl=None, replica=False):
+    """Execute SQL using active connection stored in session_state.
+
+    Reads with cached=True are served from the shared query cache (entries
+    are per MySQL account); writes invalidate every cached result that reads
+    the tables they touch. Reads with replica=True go to the local replica
+    when it is enabled and holds every table the query reads.
+    """
+    from mysql.connector import Error
+    conn = st.session_state.get("db_conn")
+    if conn is None:
+        st.error("No DB connection. Please login.")
+        return None
+    cache = get_query_cache()
+    user = st.session_state.get("username")
+    gen = None
+    if fetch and cached:
+        rows = cache.get(query, params, user)
+        if rows is not None:
+            return rows
+        gen = cache.generation(query)
+    local = _replica_for(query) if fetch and replica else None
+    if local is not None:
+        import sqlite3
+        try:
+            rows = local.query(query, params)
+            if cached:
+                cache.put(query, params, rows, ttl=ttl, user=user, gen=gen)
+            return rows
+        except sqlite3.Error:
+            pass  # e.g. SQL the replica can't run; ask the primary
+    cursor = None
+    try:
+        if fetch and cached and conn.in_transaction:
+            # end the session's REPEATABLE READ snapshot so the shared
+            # cache never stores rows older than the last commit
+            conn.commit()
+        cursor = conn.cursor(dictionary=True)
+        pending = None if fetch else _capture_audit(cursor, query, params)
+        cursor.execute(query, params or ())
+        count_queries()
+        if fetch:
+            rows = cursor.fetchall()
+            if cached:
+                cache.put(query, params, rows, ttl=ttl, user=user, gen=gen)
+            return rows
+        conn.commit()
+        written = query_cache.tables_written(query)
+        cache.invalidate_tables(written)
+        _replica_written(written)
+        if pending:
+            _queue_audit(audit.make_event(pending, st.session_state.get("username"), query, cursor.rowcount))
+        return True
+    except Error as e:
+        if not fetch:
+            # release the before-image's FOR UPDATE locks and any partial write
+            try:
+                conn.rollback()
+            except Error:
+                pass
+        show_db_error(e)
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def call_procedure(proc_name, params=None, fetch=True):
+    """Call stored procedure; returns list of rows (if any) or True."""
+    from mysql.connector import Error
+    conn = st.session_state.get("db_conn")
+    if conn is None:
+        st.error("No DB connection. Please login.")
+        return None
+    cursor = None
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.callproc(proc_name, params or [])
+        count_queries()
+        results = []
+        for res in cursor.stored_results():
+            results.extend(res.fetchall())
+        conn.commit()
+        tables = query_cache.tables_written_by_procedure(proc_name)
+        get_query_cache().invalidate_tables(tables)
+        _replica_written(tables)
+        if AUDIT_ENABLED:
+            _queue_audit(audit.procedure_event(proc_name, params, st.session_state.get("username"), tables))
+        if fetch:
+            return results
+        return True
+    except Error as e:
+        show_db_error(e)
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def execute_transaction(statements):
+    """Run (query, params) pairs in one transaction.
+
+    Returns the affected-row count of each statement, or None after rolling
+    back if any statement fails.
+    """
+    from mysql.connector import Error
+    conn = st.session_state.get("db_conn")
+    if conn is None:
+        st.error("No DB connection. Please login.")
+        return None
+    cursor = None
+    try:
+        if conn.in_transaction:
+            conn.commit()  # close the implicit read transaction left by SELECTs
+        conn.start_transaction()
+        cursor = conn.cursor()
+        counts = []
+        events = []
+        for query, params in statements:
+            pending = _capture_audit(cursor, query, params)
+            cursor.execute(query, params or ())
+            count_queries()
+            counts.append(cursor.rowcount)
+            if pending:
+                events.append(audit.make_event(pending, st.session_state.get("username"), query, cursor.rowcount))
+        conn.commit()
+        touched = set()
+        for query, _ in statements:
+            touched.update(query_cache.tables_written(query))
+        get_query_cache().invalidate_tables(touched)
+        _replica_written(touched)
+        for event in events:
+            _queue_audit(event)
+        return counts
+    except Error as e:
+        try:
+            conn.rollback()
+        except Error:
+            pass
+        show_db_error(e)
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def in_clause(values):
+    """Placeholder list for an IN (...) filter, e.g. "%s,%s,%s"."""
+    return ",".join(["%s"] * len(values))
+
+
+def execute_many(query, rows, chunk_size=1000):
+    """executemany() in chunks inside one transaction; returns rows written or None."""
+    from mysql.connector import Error
+    conn = st.session_state.get("db_conn")
+    if conn is None:
+        st.error("No DB connection. Please login.")
+        return None
+    rows = list(rows)
+    cursor = None
+    try:
+        if conn.in_transaction:
+            conn.commit()
+        conn.start_transaction()
+        cursor = conn.cursor()
+        written = 0
+        for i in range(0, len(rows), chunk_size):
+            cursor.executemany(query, rows[i:i + chunk_size])
+            count_queries()
+            written += cursor.rowcount
+        conn.commit()
+        touched = query_cache.tables_written(query)
+        get_query_cache().invalidate_tables(touched)
+        _replica_written(touched)
+        if AUDIT_ENABLED and rows:
+            partial = audit.capture(cursor, query, rows[0]) or {"action": "BATCH", "table_name": None}
+            partial.update(before=None, after={"rows": len(rows), "first": partial.get("after")})
+            _queue_audit(audit.make_event(partial, st.session_state.get("username"), query, written))
+        return written
+    except Error as e:
+        try:
+            conn.rollback()
+        except Error:
+            pass
+        show_db_error(e)
+        return None
+    finally:
+        if cursor:
+            cursor.close()
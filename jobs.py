@@ -0,0 +1,34 @@
+# jobs.py
+"""Process-wide background jobs, started once per app process."""
+import os
+
+import streamlit as st
+
+from db import connect_service, get_query_cache, get_replica
+
+
+@st.cache_resource
+def start_background_jobs():
+    """Start the scheduled jobs; they all need the service account."""
+    jobs = {}
+    if not os.environ.get("UWMS_SERVICE_USER"):
+        return jobs
+
+    interval = float(os.environ.get("UWMS_CONSISTENCY_INTERVAL", 3600))
+    if interval > 0:
+        import consistency
+        cache = get_query_cache()
+        jobs["consistency"] = consistency.ConsistencyJob(
+            connect_service, interval,
+            do_repair=os.environ.get("UWMS_CONSISTENCY_REPAIR", "1") == "1",
+            on_repaired=lambda: cache.invalidate_tables({"room"}),
+        ).start()
+
+    replica = get_replica()
+    if replica is not None:
+        import replica as replica_sync
+        jobs["replica"] = replica_sync.ReplicaSyncJob(
+            replica, connect_service, float(os.environ.get("UWMS_REPLICA_INTERVAL", 5)),
+            on_synced=get_query_cache().invalidate_tables,
+        ).start()
+    return jobs
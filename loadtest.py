@@ -0,0 +1,277 @@
+# loadtest.py
+"""Drive app.py with many simulated concurrent sessions and report how it copes.
+
+Every simulated user is a streamlit AppTest with its own session_state and
+its own MySQL connection, running in its own thread. All of them share this
+process, so the query cache and other st.cache_resource objects are shared
+the way they are between browser tabs on one server. Websocket and browser
+rendering costs are not included.
+
+    python loadtest.py --admin admin:secret --viewer viewer:secret --levels 1,5,10,20
+
+Admin sessions log in, browse the dashboard, filter faculty, open a room
+editor and allocate a free room; viewer sessions log in and browse the
+dashboard and reports. Allocation writes to the database, so point the app
+at a scratch copy (see snapshot.py) or pass --read-only.
+
+For each concurrency level the report shows throughput, p50/p99 latency per
+interaction, DB queries per interaction (from the session's _query_count),
+session state per session (_state_bytes, as measured by session_mgr) and
+the traced growth of the whole process during the level. Process growth
+includes the test harness (AppTest and its mock runtimes) and shared caches,
+so it is an upper bound, not a per-session figure.
+"""
+import argparse
+import os
+import random
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+
+from streamlit.testing.v1 import AppTest
+
+from perf import percentile
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+RUN_TIMEOUT = 60
+SEARCH_TERMS = ["a", "e", "an", "ra", "sh"]
+
+
+def _pin_runtime():
+    """Keep one Runtime visible to every thread.
+
+    AppTest installs a mock Runtime for each run and clears it when the run
+    ends, which would pull it out from under runs still going in other threads.
+    """
+    # Monkeypatches the private Runtime.instance/exists classmethods and relies
+    # on Runtime._instance; written against streamlit==1.32.0 (requirements.txt)
+    # and likely to break on other versions.
+    from streamlit.runtime import Runtime
+    seen = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            seen["runtime"] = cls._instance
+        if "runtime" not in seen:
+            raise RuntimeError("Runtime hasn't been created!")
+        return seen["runtime"]
+
+    def exists(cls):
+        return cls._instance is not None or "runtime" in seen
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+
+
+class Results:
+    """Interaction samples from every session at one concurrency level."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency_ms = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.errors = defaultdict(list)
+
+    def record(self, step, ms, queries, errors):
+        with self._lock:
+            self.latency_ms[step].append(ms)
+            self.queries[step].append(queries)
+            self.errors[step].extend(errors)
+
+    def interactions(self):
+        return sum(len(v) for v in self.latency_ms.values())
+
+
+class SimSession:
+    """One simulated browser session; each step is one interaction (rerun)."""
+
+    def __init__(self, username, password, admin, results, rng, read_only=False):
+        self.username = username
+        self.password = password
+        self.admin = admin
+        self.results = results
+        self.rng = rng
+        self.read_only = read_only
+        self.at = AppTest.from_file(APP_PATH, default_timeout=RUN_TIMEOUT)
+
+    def _query_count(self):
+        try:
+            return self.at.session_state["_query_count"]
+        except KeyError:
+            return 0
+
+    def state_bytes(self):
+        """Session state size recorded by session_mgr.enforce() at the end of the last run."""
+        try:
+            return self.at.session_state["_state_bytes"]
+        except KeyError:
+            return None
+
+    def step(self, name, action):
+        before = self._query_count()
+        start = time.perf_counter()
+        try:
+            ran = action()
+        except Exception as e:
+            self.results.record(name, (time.perf_counter() - start) * 1000.0, 0, [f"{type(e).__name__}: {e}"])
+            return
+        if ran is False:
+            return  # nothing to do on this page (e.g. no free rooms)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        errors = [e.value for e in self.at.error] + [e.message for e in self.at.exception]
+        self.results.record(name, elapsed_ms, self._query_count() - before, errors)
+
+    # -- interactions -------------------------------------------------------
+    def login(self):
+        self.at.run()
+        self.at.text_input(key="login_user").input(self.username)
+        self.at.text_input(key="login_pass").input(self.password)
+        self.at.button(key="login_button").click().run()
+        if not self.at.session_state["logged_in"]:
+            raise RuntimeError(f"login failed for {self.username}")
+        self.at.run()  # first run with the sidebar
+
+    def goto(self, page):
+        self.at.sidebar.radio[0].set_value(page).run()
+
+    def filter_faculty(self):
+        self.goto("👨‍🏫 Faculty")
+        depts = [s for s in self.at.selectbox if s.label == "Filter by Department"]
+        if depts and len(depts[0].options) > 1:
+            depts[0].set_value(self.rng.choice(depts[0].options[1:]))
+        self.at.text_input(key="fac_search").input(self.rng.choice(SEARCH_TERMS)).run()
+
+    def open_room_editor(self):
+        self.goto("🏢 Rooms")
+        edits = [b for b in self.at.button if (b.key or "").startswith("edit_room_") and "form" not in b.key]
+        if not edits:
+            return False
+        self.rng.choice(edits).click().run()
+
+    def allocate(self):
+        self.goto("📋 Allocations")
+        boxes = {s.key: s for s in self.at.selectbox if s.key in ("alloc_fac", "alloc_room")}
+        if len(boxes) < 2 or len(boxes["alloc_fac"].options) < 2 or len(boxes["alloc_room"].options) < 2:
+            return False
+        boxes["alloc_fac"].set_value(self.rng.choice(boxes["alloc_fac"].options[1:]))
+        boxes["alloc_room"].set_value(self.rng.choice(boxes["alloc_room"].options[1:]))
+        next(b for b in self.at.button if b.label == "Allocate Room").click().run()
+
+    # -- scenarios ----------------------------------------------------------
+    def run(self, rounds):
+        self.step("login", self.login)
+        for _ in range(rounds):
+            self.step("dashboard", lambda: self.goto("📊 Dashboard"))
+            if self.admin:
+                self.step("faculty filter", self.filter_faculty)
+                self.step("room editor", self.open_room_editor)
+                if not self.read_only:
+                    self.step("allocate", self.allocate)
+            else:
+                self.step("reports", lambda: self.goto("📈 Reports"))
+
+    def close(self):
+        conn = self.at.session_state["db_conn"] if "db_conn" in self.at.session_state else None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+def _credentials(value):
+    user, _, password = value.partition(":")
+    return user, password
+
+
+def run_level(n, accounts, rounds, read_only, seed):
+    """Run n sessions at once.
+
+    Returns (results, wall seconds, session state bytes per session,
+    traced process growth in bytes or None).
+    """
+    results = Results()
+    base = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+    sessions = []
+    for i in range(n):
+        (user, password), admin = accounts[i % len(accounts)]
+        sessions.append(SimSession(user, password, admin, results, random.Random(seed + i), read_only))
+
+    barrier = threading.Barrier(n)
+
+    def worker(session):
+        barrier.wait()
+        session.run(rounds)
+
+    threads = [threading.Thread(target=worker, args=(s,), name=f"sim-{i}") for i, s in enumerate(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    growth = None
+    if base is not None:
+        growth = tracemalloc.get_traced_memory()[0] - base
+    state = [b for b in (s.state_bytes() for s in sessions) if b is not None]
+    for s in sessions:
+        s.close()
+    return results, wall, state, growth
+
+
+def print_level(n, results, wall, state, growth):
+    total = results.interactions()
+    all_ms = [ms for v in results.latency_ms.values() for ms in v]
+    print(f"\n=== {n} concurrent session(s) ===")
+    print(f"interactions: {total}  wall: {wall:.1f}s  throughput: {total / wall:.1f}/s"
+          f"  p50: {percentile(all_ms, 50) or 0:.0f} ms  p99: {percentile(all_ms, 99) or 0:.0f} ms")
+    if state:
+        print(f"session state: avg {sum(state) / len(state) / 1024:.0f} KiB"
+              f"  max {max(state) / 1024:.0f} KiB  (session_mgr)")
+    if growth is not None:
+        print(f"process growth: {growth / 1024:.0f} KiB over {n} session(s)"
+              " (tracemalloc, includes AppTest harness and shared caches)")
+    print(f"{'interaction':<16}{'count':>7}{'p50 ms':>9}{'p99 ms':>9}{'queries':>9}{'errors':>8}")
+    for step, values in results.latency_ms.items():
+        queries = results.queries[step]
+        print(f"{step:<16}{len(values):>7}{percentile(values, 50):>9.0f}{percentile(values, 99):>9.0f}"
+              f"{sum(queries) / len(queries):>9.1f}{len(results.errors[step]):>8}")
+    for step, errors in results.errors.items():
+        for message in sorted(set(errors))[:3]:
+            print(f"  {step}: {message}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Streamlit app with simulated sessions")
+    parser.add_argument("--admin", help="MySQL admin account as user:password")
+    parser.add_argument("--viewer", help="MySQL viewer account as user:password")
+    parser.add_argument("--levels", default="1,5,10,20", help="comma separated session counts")
+    parser.add_argument("--rounds", type=int, default=3, help="scenario repetitions per session")
+    parser.add_argument("--read-only", action="store_true", help="skip the allocation step")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (it slows every run)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    accounts = []
+    if args.admin:
+        accounts.append((_credentials(args.admin), True))
+    if args.viewer:
+        accounts.append((_credentials(args.viewer), False))
+    if not accounts:
+        parser.error("give --admin and/or --viewer")
+    levels = [int(x) for x in args.levels.split(",") if x.strip()]
+
+    _pin_runtime()
+    # warm-up: imports, page modules and shared caches, as on a server that has been up a while
+    run_level(len(accounts), accounts, 1, args.read_only, args.seed)
+    if not args.no_memory:
+        tracemalloc.start()
+    for n in levels:
+        results, wall, state, growth = run_level(n, accounts, args.rounds, args.read_only, args.seed + n * 1000)
+        print_level(n, results, wall, state, growth)
+
+
+if __name__ == "__main__":
+    main()
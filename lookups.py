@@ -0,0 +1,55 @@
+# lookups.py
+from db import execute_query
+
+# -------------------------
+# Utility helpers
+# -------------------------
+def get_all_campuses():
+    rows = execute_query("SELECT campus_id, campus_name FROM campus ORDER BY campus_name", cached=True, replica=True)
+    return rows or []
+
+
+def get_blocks_by_campus(campus_id):
+    rows = execute_query("SELECT block_id, block_name FROM block WHERE campus_id=%s ORDER BY block_name", (campus_id,), cached=True, replica=True)
+    return rows or []
+
+
+def get_buildings_by_block(block_id):
+    rows = execute_query("SELECT building_id, build_name FROM building WHERE block_id=%s ORDER BY build_name", (block_id,), cached=True, replica=True)
+    return rows or []
+
+
+def get_floors_by_building(building_id):
+    rows = execute_query("SELECT floor_no, floor_name FROM floor WHERE building_id=%s ORDER BY floor_no", (building_id,), cached=True, replica=True)
+    return rows or []
+
+
+def get_all_floors():
+    """Every floor with its full hierarchy path, for floor pickers."""
+    rows = execute_query("SELECT floor_no, get_floor_path(floor_no) AS path FROM floor ORDER BY floor_no", cached=True)
+    return rows or []
+
+
+def get_floor_path(floor_no):
+    """Call MySQL function get_floor_path(floor_no) and return the string or None."""
+    res = execute_query("SELECT get_floor_path(%s) AS path", (floor_no,), cached=True)
+    if res and len(res) > 0:
+        return res[0].get('path')
+    return None
+
+
+def get_room_path(room_no):
+    res = execute_query("SELECT get_room_path(%s) AS path", (room_no,), cached=True)
+    if res and len(res) > 0:
+        return res[0].get('path')
+    return None
+
+
+def get_department_map():
+    res = execute_query("SELECT dept_id, dept_name FROM department ORDER BY dept_name", cached=True, replica=True)
+    return {r['dept_name']: r['dept_id'] for r in res} if res else {}
+
+
+def get_available_rooms():
+    res = execute_query("SELECT room_no FROM room WHERE is_allotted=0 ORDER BY room_no", cached=True)
+    return [r['room_no'] for r in res] if res else []
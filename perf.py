@@ -0,0 +1,79 @@
+# perf.py
+"""Startup and rerun timing.
+
+IMPORT_START is taken when app.py first imports this module, after the
+interpreter and streamlit have started, so "first render" excludes their
+startup and covers app.py's imports plus the first script run.
+Per-session rerun timings are kept in a short ring buffer in session_state;
+process-wide figures (first render, page module load times) live here.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+IMPORT_START = time.perf_counter()
+RERUN_HISTORY = 50
+
+log = logging.getLogger("uwms.perf")
+if os.environ.get("UWMS_TIMING_LOG"):
+    logging.basicConfig(level=logging.INFO)
+    log.setLevel(logging.INFO)
+
+_lock = threading.Lock()
+_process = {"first_render_ms": None, "module_load_ms": {}}
+
+
+def record_module_load(module_name, seconds):
+    with _lock:
+        _process["module_load_ms"][module_name] = seconds * 1000.0
+    log.info("loaded %s in %.1f ms", module_name, seconds * 1000.0)
+
+
+@contextmanager
+def rerun_timer(session_state, label):
+    """Time one script run and store it in the session's ring buffer."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        with _lock:
+            if _process["first_render_ms"] is None:
+                _process["first_render_ms"] = (time.perf_counter() - IMPORT_START) * 1000.0
+                log.info("time to first render since app import: %.1f ms", _process["first_render_ms"])
+        history = session_state.get("_rerun_ms")
+        if history is None:
+            history = deque(maxlen=RERUN_HISTORY)
+            session_state["_rerun_ms"] = history
+        history.append((label, elapsed_ms))
+        log.info("rerun %s took %.1f ms", label, elapsed_ms)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of values; None when empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def report(session_state):
+    """Summary dict for the timing panel."""
+    history = list(session_state.get("_rerun_ms") or ())
+    values = [ms for _, ms in history]
+    with _lock:
+        first_render = _process["first_render_ms"]
+        module_load = dict(_process["module_load_ms"])
+    return {
+        "first_render_ms": first_render,
+        "reruns": len(values),
+        "last_rerun_ms": values[-1] if values else None,
+        "p50_rerun_ms": percentile(values, 50),
+        "p95_rerun_ms": percentile(values, 95),
+        "module_load_ms": module_load,
+        "history": history,
+    }
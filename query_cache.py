@@ -0,0 +1,273 @@
+# query_cache.py
+"""Shared query-result cache used by read-heavy pages.
+
+Results are keyed by MySQL account + normalized SQL + parameters, so sessions
+share entries only with sessions that have the same grants. Entries expire
+after a TTL, the in-memory tier is bounded with LRU eviction, and every entry
+is tagged with the tables it reads so writes can invalidate exactly what they
+touch. An optional SQLite file acts as a second tier so the cache survives
+restarts.
+
+A read that overlaps an invalidation must not store its (possibly older)
+result afterwards: callers take generation(query) before reading and pass it
+to put(), which drops the result if any of its tables was invalidated since.
+"""
+import hashlib
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 512
+
+# Tables read by the MySQL functions the app calls in SELECT lists.
+FUNCTION_TABLES = {
+    "get_block_path": ("block", "campus"),
+    "get_building_path": ("building", "block", "campus"),
+    "get_floor_path": ("floor", "building", "block", "campus"),
+    "get_room_path": ("room", "floor", "building", "block", "campus"),
+    "faculty_count": ("faculty",),
+}
+
+# Tables written by stored procedures called through call_procedure().
+PROCEDURE_TABLES = {
+    "add_faculty": ("faculty",),
+}
+
+# Extra tables changed by triggers or cascading foreign keys when a table is written.
+TRIGGER_TABLES = {
+    "faculty": ("department", "faculty_log", "asset", "asset_room_count"),
+    "room": ("room_reservation", "asset", "asset_room_count"),
+    "asset": ("asset_room_count",),
+}
+
+_READ_TABLES_RE = re.compile(r"\b(?:FROM|JOIN)\s+`?([A-Za-z_][A-Za-z0-9_]*)`?", re.IGNORECASE)
+_FUNC_RE = re.compile(r"\b([A-Za-z_][A-Za-z0-9_]*)\s*\(")
+_WRITE_TABLE_RE = re.compile(
+    r"^\s*(?:INSERT\s+(?:IGNORE\s+)?INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM|TRUNCATE\s+(?:TABLE\s+)?)\s+`?([A-Za-z_][A-Za-z0-9_]*)`?",
+    re.IGNORECASE,
+)
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_sql(query):
+    """Collapse whitespace so formatting differences share one cache entry."""
+    return _WS_RE.sub(" ", query).strip()
+
+
+def make_key(query, params, user=None):
+    raw = (user or "") + "\x00" + normalize_sql(query) + "\x00" + repr(tuple(params or ()))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def tables_read(query):
+    """Tables a SELECT depends on, including those behind known functions."""
+    tables = {t.lower() for t in _READ_TABLES_RE.findall(query)}
+    for fn in _FUNC_RE.findall(query):
+        tables.update(FUNCTION_TABLES.get(fn.lower(), ()))
+    return tables
+
+
+def tables_written(query):
+    """Tables a write statement changes, including trigger side effects."""
+    m = _WRITE_TABLE_RE.match(query)
+    if not m:
+        return set()
+    return _with_trigger_tables({m.group(1).lower()})
+
+
+def tables_written_by_procedure(proc_name):
+    return _with_trigger_tables(set(PROCEDURE_TABLES.get(proc_name, ())))
+
+
+def _with_trigger_tables(tables):
+    out = set(tables)
+    for t in tables:
+        out.update(TRIGGER_TABLES.get(t, ()))
+    return out
+
+
+class QueryCache:
+    """Thread-safe LRU + TTL cache with table-tag invalidation."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, default_ttl=DEFAULT_TTL, disk_path=None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, tags, rows)
+        self._by_tag = {}              # table -> set(keys)
+        self._gens = {}                # table -> invalidation count
+        self._epoch = 0                # bumped by clear()
+        self.hits = 0
+        self.misses = 0
+        self._disk = None
+        if disk_path:
+            self._disk = _DiskTier(disk_path)
+
+    def get(self, query, params=None, user=None):
+        """Return cached rows or None."""
+        key = make_key(query, params, user)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                self._drop(key)
+            gen = self._generation(tables_read(query))
+        if self._disk is not None:
+            found = self._disk.get(key, now)
+            if found is not None:
+                expires_at, tags, rows = found
+                with self._lock:
+                    # an invalidation may have deleted the disk row after we read it
+                    if gen == self._generation(tags):
+                        self._store(key, expires_at, tags, rows)
+                    self.hits += 1
+                return rows
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def generation(self, query):
+        """Token for put(): changes when any table the query reads is invalidated."""
+        tags = tables_read(query)
+        with self._lock:
+            return self._generation(tags)
+
+    def put(self, query, params, rows, ttl=None, user=None, gen=None):
+        """Store rows; skipped when gen (from generation()) is out of date."""
+        key = make_key(query, params, user)
+        tags = frozenset(tables_read(query))
+        expires_at = time.time() + (ttl if ttl is not None else self.default_ttl)
+        with self._lock:
+            if gen is not None and gen != self._generation(tags):
+                return
+            self._store(key, expires_at, tags, rows)
+        if self._disk is not None:
+            self._disk.put(key, expires_at, tags, rows)
+            with self._lock:
+                stale = gen is not None and gen != self._generation(tags)
+            if stale:  # invalidated while the row was being written
+                self._disk.delete(key)
+
+    def invalidate_tables(self, tables):
+        """Drop every entry that reads any of the given tables."""
+        tables = {t.lower() for t in tables}
+        if not tables:
+            return
+        with self._lock:
+            keys = set()
+            for t in tables:
+                self._gens[t] = self._gens.get(t, 0) + 1
+                keys.update(self._by_tag.get(t, ()))
+            for key in keys:
+                self._drop(key)
+        if self._disk is not None:
+            self._disk.invalidate(tables)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_tag.clear()
+            self._epoch += 1
+        if self._disk is not None:
+            self._disk.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    # internal helpers; caller holds self._lock
+    def _generation(self, tags):
+        return self._epoch, tuple(self._gens.get(t, 0) for t in sorted(tags))
+    def _store(self, key, expires_at, tags, rows):
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (expires_at, tags, rows)
+        for t in tags:
+            self._by_tag.setdefault(t, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for t in entry[1]:
+            keys = self._by_tag.get(t)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[t]
+
+
+class _DiskTier:
+    """SQLite-backed second tier shared by restarts and app processes on one host.
+
+    Invalidation in one process deletes the disk rows but cannot reach the
+    memory tier of the others: there a stale entry lives until its TTL
+    expires, so keep UWMS_QUERY_CACHE_TTL short when several processes share
+    the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS query_cache (
+                                  cache_key TEXT PRIMARY KEY,
+                                  expires_at REAL NOT NULL,
+                                  tags TEXT NOT NULL,
+                                  payload BLOB NOT NULL)""")
+        self._conn.execute("DELETE FROM query_cache WHERE expires_at <= ?", (time.time(),))
+        self._conn.commit()
+
+    def get(self, key, now):
+        with self._lock:
+            row = self._conn.execute("SELECT expires_at, tags, payload FROM query_cache WHERE cache_key=?",
+                                     (key,)).fetchone()
+        if row is None or row[0] <= now:
+            return None
+        tags = frozenset(t for t in row[1].split(",") if t)
+        return row[0], tags, pickle.loads(row[2])
+
+    def put(self, key, expires_at, tags, rows):
+        payload = pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO query_cache VALUES (?,?,?,?)",
+                               (key, expires_at, "," + ",".join(sorted(tags)) + ",", payload))
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM query_cache WHERE cache_key=?", (key,))
+            self._conn.commit()
+
+    def invalidate(self, tables):
+        with self._lock:
+            for t in tables:
+                self._conn.execute("DELETE FROM query_cache WHERE tags LIKE ?", (f"%,{t},%",))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM query_cache")
+            self._conn.commit()
+
+
+def cache_from_env():
+    """Build the process-wide cache from UWMS_QUERY_CACHE_* environment variables."""
+    return QueryCache(
+        max_entries=int(os.environ.get("UWMS_QUERY_CACHE_SIZE", DEFAULT_MAX_ENTRIES)),
+        default_ttl=float(os.environ.get("UWMS_QUERY_CACHE_TTL", DEFAULT_TTL)),
+        disk_path=os.environ.get("UWMS_QUERY_CACHE_DB") or None,
+    )
@@ -0,0 +1,310 @@
+# replica.py
+"""Local SQLite read replica of the hierarchy, room, department and faculty tables.
+
+Triggers on the primary append (table, primary key) to change_log for every
+insert, update and delete. A background job pulls the entries past the
+replica's watermark, re-reads just those rows from MySQL and replaces them
+locally in one SQLite transaction. The first sync, and any sync after a
+snapshot import or a long outage, copies the tables in full instead.
+
+Reads that only touch mirrored tables can then be answered from the local
+file (see db.execute_query(replica=True)); they keep working while MySQL is
+slow or down. Writes always go to MySQL.
+"""
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+
+log = logging.getLogger("uwms.replica")
+
+# mirrored table -> primary key
+TABLES = {
+    "campus": "campus_id",
+    "block": "block_id",
+    "building": "building_id",
+    "department": "dept_id",
+    "floor": "floor_no",
+    "room": "room_no",
+    "faculty": "faculty_id",
+}
+FULL_RELOAD = "*"        # change_log.table_name written by snapshot imports
+REPLAY_SECONDS = 60      # re-read recent entries: ids are allocated before commit
+RETENTION_DAYS = 7       # change_log rows older than this are pruned (ev_prune_change_log)
+FETCH_ROWS = 5000
+IN_CHUNK = 1000
+
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda v: v.isoformat(sep=" "))
+sqlite3.register_converter("DATE", lambda b: date.fromisoformat(b.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda b: datetime.fromisoformat(b.decode()))
+
+_PARAM_RE = re.compile(r"%([s%])")
+_INT_TYPES = {"tinyint", "smallint", "mediumint", "int", "bigint", "bit", "year"}
+_DECL_TYPES = {"date": "DATE", "datetime": "TIMESTAMP", "timestamp": "TIMESTAMP",
+               "float": "REAL", "double": "REAL", "decimal": "REAL"}
+
+
+def to_sqlite(query):
+    """mysql-connector placeholders (%s, %%) to sqlite3 ones."""
+    return _PARAM_RE.sub(lambda m: "?" if m.group(1) == "s" else "%", query)
+
+
+def _decl_type(data_type):
+    return "INTEGER" if data_type in _INT_TYPES else _DECL_TYPES.get(data_type, "TEXT")
+
+
+class Replica:
+    """SQLite file holding the mirrored tables plus a replica_meta key/value table."""
+
+    def __init__(self, path):
+        self.path = path
+        self.started = 0      # sync passes begun, for read-your-writes
+        self.completed = 0    # number of the last pass that succeeded
+        self.last_error = None
+        self._ready = False
+        self._recent = set()  # change_ids inside the replay window already applied
+        self._wake = threading.Event()
+        self._readers = queue.LifoQueue()
+        with self._writer() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS replica_meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    # -- local connections --------------------------------------------------
+    def _open(self):
+        db = sqlite3.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES,
+                             isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    @contextmanager
+    def _writer(self):
+        db = self._open()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @contextmanager
+    def _reader(self):
+        try:
+            db = self._readers.get_nowait()
+        except queue.Empty:
+            db = self._open()
+            db.execute("PRAGMA query_only=1")
+        try:
+            yield db
+        finally:
+            self._readers.put(db)
+
+    def _meta(self, db):
+        return dict(db.execute("SELECT key, value FROM replica_meta").fetchall())
+
+    @property
+    def ready(self):
+        """True once a full load has completed (possibly in an earlier process)."""
+        if not self._ready:
+            with self._reader() as db:
+                self._ready = "watermark" in self._meta(db)
+        return self._ready
+
+    def status(self):
+        with self._reader() as db:
+            meta = self._meta(db)
+        synced_at = float(meta["synced_at"]) if "synced_at" in meta else None
+        return {"ready": "watermark" in meta, "watermark": int(meta.get("watermark", 0)),
+                "synced_at": synced_at, "lag_s": time.time() - synced_at if synced_at else None,
+                "last_error": self.last_error}
+
+    # -- reads --------------------------------------------------------------
+    def covers(self, tables):
+        return bool(tables) and all(t in TABLES for t in tables)
+
+    def query(self, query, params=None):
+        """Rows as dicts, like a dictionary cursor on the primary."""
+        with self._reader() as db:
+            cur = db.execute(to_sqlite(query), tuple(params or ()))
+            cols = [d[0] for d in cur.description]
+            return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+    # -- sync ---------------------------------------------------------------
+    def request_sync(self):
+        """Wake the sync job early (after a write through this process)."""
+        self._wake.set()
+
+    def sync(self, conn):
+        """One pass: incremental when possible, otherwise a full load.
+
+        Returns the set of tables that changed.
+        """
+        self.started += 1
+        this_pass = self.started
+        changed = self._pass(conn)
+        # only a pass that succeeded makes earlier writes visible (read-your-writes)
+        self.completed = this_pass
+        return changed
+
+    def _pass(self, conn):
+        with self._writer() as db:
+            meta = self._meta(db)
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT COALESCE(MAX(change_id), 0) FROM change_log")
+            latest = cursor.fetchone()[0]
+            watermark = int(meta["watermark"]) if "watermark" in meta else None
+            stale = "synced_at" in meta and time.time() - float(meta["synced_at"]) > (RETENTION_DAYS - 1) * 86400
+            if watermark is None or stale or latest < watermark:
+                return self.full_load(conn)
+            cursor.execute("""SELECT change_id, table_name, row_id FROM change_log
+                              WHERE change_id > %s OR changed_at >= NOW() - INTERVAL %s SECOND
+                              ORDER BY change_id""", (watermark, REPLAY_SECONDS))
+            changes = cursor.fetchall()
+        finally:
+            cursor.close()
+        if any(table == FULL_RELOAD and cid > watermark for cid, table, _ in changes):
+            return self.full_load(conn)
+        new = [c for c in changes if c[0] > watermark or c[0] not in self._recent]
+        changed = self._apply(conn, new, max([watermark, latest] + [c[0] for c in changes]))
+        self._recent = {c[0] for c in changes}
+        return changed
+
+    def _apply(self, conn, changes, watermark):
+        ids = {}
+        for _, table, row_id in changes:
+            if table in TABLES:
+                ids.setdefault(table, set()).add(row_id)
+        rows = {}
+        cursor = conn.cursor()
+        try:
+            for table, keys in ids.items():
+                keys = sorted(keys)
+                rows[table] = (None, [])
+                for i in range(0, len(keys), IN_CHUNK):
+                    chunk = keys[i:i + IN_CHUNK]
+                    cursor.execute(f"SELECT * FROM {table} WHERE {TABLES[table]} IN ({','.join(['%s'] * len(chunk))})",
+                                   tuple(chunk))
+                    rows[table] = (cursor.column_names, rows[table][1] + cursor.fetchall())
+        finally:
+            cursor.close()
+        conn.commit()  # end the read transaction so the next pass sees new commits
+
+        with self._writer() as db:
+            try:
+                db.execute("BEGIN IMMEDIATE")
+                for table, keys in ids.items():
+                    keys = sorted(keys)
+                    for i in range(0, len(keys), IN_CHUNK):
+                        chunk = keys[i:i + IN_CHUNK]
+                        db.execute(f"DELETE FROM {table} WHERE {TABLES[table]} IN ({','.join('?' * len(chunk))})", chunk)
+                    cols, found = rows[table]
+                    if found:
+                        db.executemany(f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({','.join('?' * len(cols))})",
+                                       found)
+                self._set_meta(db, watermark=watermark, synced_at=time.time())
+                db.execute("COMMIT")
+            except sqlite3.Error:
+                db.execute("ROLLBACK")
+                raise
+        return set(ids)
+
+    def full_load(self, conn):
+        """Copy every mirrored table inside one consistent snapshot; readers see the old copy until commit."""
+        if conn.in_transaction:
+            conn.commit()
+        conn.start_transaction(consistent_snapshot=True, readonly=True)
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT COALESCE(MAX(change_id), 0) FROM change_log")
+            watermark = cursor.fetchone()[0]
+            names = ",".join(["%s"] * len(TABLES))
+            cursor.execute(f"""SELECT table_name, column_name, data_type FROM information_schema.columns
+                               WHERE table_schema = DATABASE() AND table_name IN ({names})
+                               ORDER BY table_name, ordinal_position""", tuple(TABLES))
+            columns = {}
+            for table, column, data_type in cursor.fetchall():
+                columns.setdefault(table.lower(), []).append((column, data_type.lower()))
+            cursor.execute(f"""SELECT table_name, index_name, column_name FROM information_schema.statistics
+                               WHERE table_schema = DATABASE() AND table_name IN ({names}) AND index_name <> 'PRIMARY'
+                               ORDER BY table_name, index_name, seq_in_index""", tuple(TABLES))
+            indexes = {}
+            for table, index, column in cursor.fetchall():
+                indexes.setdefault((table.lower(), index), []).append(column)
+
+            with self._writer() as db:
+                try:
+                    db.execute("BEGIN IMMEDIATE")
+                    for table, pk in TABLES.items():
+                        cols = columns[table]
+                        db.execute(f"DROP TABLE IF EXISTS {table}")
+                        db.execute(f"CREATE TABLE {table} ("
+                                   + ", ".join(f"{c} {_decl_type(t)}" for c, t in cols)
+                                   + f", PRIMARY KEY ({pk}))")
+                        insert = (f"INSERT INTO {table} ({', '.join(c for c, _ in cols)}) "
+                                  f"VALUES ({','.join('?' * len(cols))})")
+                        cursor.execute(f"SELECT {', '.join(c for c, _ in cols)} FROM {table}")
+                        while True:
+                            batch = cursor.fetchmany(FETCH_ROWS)
+                            if not batch:
+                                break
+                            db.executemany(insert, batch)
+                    for (table, index), cols in indexes.items():
+                        db.execute(f"CREATE INDEX {table}_{index} ON {table} ({', '.join(cols)})")
+                    now = time.time()
+                    self._set_meta(db, watermark=watermark, synced_at=now, full_loaded_at=now)
+                    db.execute("COMMIT")
+                except sqlite3.Error:
+                    db.execute("ROLLBACK")
+                    raise
+        finally:
+            cursor.close()
+            conn.commit()
+        self._ready = True
+        self._recent = set()
+        log.info("replica full load at change %s", watermark)
+        return set(TABLES)
+
+    def _set_meta(self, db, **values):
+        db.executemany("INSERT OR REPLACE INTO replica_meta (key, value) VALUES (?, ?)",
+                       [(k, str(v)) for k, v in values.items()])
+
+
+class ReplicaSyncJob:
+    """Background thread that keeps a Replica in step with the primary."""
+
+    def __init__(self, replica, connect, interval, on_synced=None):
+        self.replica = replica
+        self.connect = connect
+        self.interval = interval
+        self.on_synced = on_synced
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="uwms-replica", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.replica.request_sync()
+
+    def _loop(self):
+        conn = None
+        while not self._stop.is_set():
+            try:
+                if conn is None or not conn.is_connected():
+                    conn = self.connect()
+                changed = self.replica.sync(conn)
+                self.replica.last_error = None
+                if changed and self.on_synced:
+                    self.on_synced(changed)
+            except Exception as e:
+                # keep serving the last good copy; retry on the next tick
+                self.replica.last_error = str(e)
+                log.warning("replica sync failed: %s", e)
+                conn = None
+            self.replica._wake.wait(self.interval)
+            self.replica._wake.clear()
@@ -0,0 +1,223 @@
+# reservations.py
+"""Time-slot bookings on top of the room table.
+
+Bookings in one room never overlap, so per room the intervals sorted by start
+are also sorted by end. IntervalIndex keeps two parallel sorted lists per
+room and answers overlap checks with a single bisect.
+
+No booking is longer than MAX_BOOKING_LEN (checked here and by the
+chk_reservation_length constraint), so a booking overlapping [A, B) must
+start after A - MAX_BOOKING_LEN. Overlap queries add that lower bound, which
+turns them into a bounded range scan on the (room_no, start_time, end_time)
+and (start_time, end_time) indexes instead of reading every older booking.
+"""
+import csv
+import io
+from bisect import bisect_right, insort
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import audit
+
+INSERT_CHUNK = 1000
+MAX_BOOKING_LEN = timedelta(hours=24)  # keep in sync with chk_reservation_length
+
+WEEKDAYS = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+
+
+class IntervalIndex:
+    """Sorted, non-overlapping [start, end) intervals per room."""
+
+    def __init__(self):
+        self._starts = defaultdict(list)
+        self._ends = defaultdict(list)
+
+    def __len__(self):
+        return sum(len(v) for v in self._starts.values())
+
+    def conflicts(self, room_no, start, end):
+        """Intervals in room_no that overlap [start, end)."""
+        starts, ends = self._starts.get(room_no), self._ends.get(room_no)
+        if not starts:
+            return []
+        out = []
+        i = bisect_right(ends, start)  # first interval ending after start
+        while i < len(starts) and starts[i] < end:
+            out.append((starts[i], ends[i]))
+            i += 1
+        return out
+
+    def is_free(self, room_no, start, end):
+        starts, ends = self._starts.get(room_no), self._ends.get(room_no)
+        if not starts:
+            return True
+        i = bisect_right(ends, start)
+        return i >= len(starts) or starts[i] >= end
+
+    def add(self, room_no, start, end):
+        """Insert an interval; returns False (and leaves the index alone) on overlap."""
+        if not self.is_free(room_no, start, end):
+            return False
+        insort(self._starts[room_no], start)
+        insort(self._ends[room_no], end)
+        return True
+
+    def free_rooms(self, room_nos, start, end):
+        return [rn for rn in room_nos if self.is_free(rn, start, end)]
+
+
+def load_index(conn, window_start, window_end, room_nos=None):
+    """Index every booking that overlaps the window, optionally for some rooms only."""
+    index = IntervalIndex()
+    query = """SELECT room_no, start_time, end_time FROM room_reservation
+               WHERE start_time > %s AND start_time < %s AND end_time > %s"""
+    params = [window_start - MAX_BOOKING_LEN, window_end, window_start]
+    if room_nos:
+        query += f" AND room_no IN ({','.join(['%s'] * len(room_nos))})"
+        params.extend(room_nos)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, tuple(params))
+        for room_no, start, end in cursor:
+            index.add(room_no, start, end)
+    finally:
+        cursor.close()
+    return index
+
+
+def _lock_rooms(cursor, room_nos):
+    """Lock the room rows so concurrent bookings for them serialize."""
+    cursor.execute(f"SELECT room_no FROM room WHERE room_no IN ({','.join(['%s'] * len(room_nos))}) FOR UPDATE",
+                   tuple(room_nos))
+    return {r[0] for r in cursor.fetchall()}
+
+
+def import_bookings(conn, bookings, booked_by, source="manual"):
+    """Insert bookings that don't conflict, in one transaction.
+
+    bookings is an iterable of (room_no, start, end, purpose). Returns
+    (inserted_count, rejected) where rejected lists (booking, reason).
+    """
+    bookings = list(bookings)
+    if not bookings:
+        return 0, []
+    rejected = []
+    valid = []
+    for b in bookings:
+        if b[2] <= b[1]:
+            rejected.append((b, "end before start"))
+        elif b[2] - b[1] > MAX_BOOKING_LEN:
+            rejected.append((b, f"longer than {MAX_BOOKING_LEN.total_seconds() / 3600:.0f} hours"))
+        else:
+            valid.append(b)
+    if not valid:
+        return 0, rejected
+
+    room_nos = sorted({b[0] for b in valid})
+    window_start = min(b[1] for b in valid)
+    window_end = max(b[2] for b in valid)
+    if conn.in_transaction:
+        conn.commit()
+    conn.start_transaction()
+    cursor = conn.cursor()
+    try:
+        existing_rooms = _lock_rooms(cursor, room_nos)
+        index = load_index(conn, window_start, window_end, room_nos)
+        rows = []
+        for b in sorted(valid, key=lambda b: (b[0], b[1])):
+            room_no, start, end, purpose = b
+            if room_no not in existing_rooms:
+                rejected.append((b, "unknown room"))
+            elif not index.add(room_no, start, end):
+                rejected.append((b, "overlaps an existing booking"))
+            else:
+                rows.append((room_no, start, end, purpose, booked_by, source))
+        for i in range(0, len(rows), INSERT_CHUNK):
+            cursor.executemany("""INSERT INTO room_reservation
+                                  (room_no, start_time, end_time, purpose, booked_by, source)
+                                  VALUES (%s,%s,%s,%s,%s,%s)""", rows[i:i + INSERT_CHUNK])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    if rows:
+        audit.record_now(conn, audit.summary_event(
+            "INSERT", "room_reservation", booked_by, f"import_bookings (source={source})", len(rows),
+            {"source": source, "rejected": len(rejected),
+             "rows": [{"room_no": r[0], "start_time": r[1], "end_time": r[2], "purpose": r[3]}
+                      for r in rows[:audit.MAX_BEFORE_ROWS]]}))
+    return len(rows), rejected
+
+
+def book(conn, room_no, start, end, purpose, booked_by):
+    """Book one slot. Returns (True, None) or (False, reason)."""
+    inserted, rejected = import_bookings(conn, [(room_no, start, end, purpose)], booked_by)
+    if inserted:
+        return True, None
+    return False, rejected[0][1]
+
+
+def free_rooms(conn, building_id, start, end, room_type=None):
+    """Rooms in a building with no booking overlapping [start, end)."""
+    query = """SELECT r.room_no, r.location, r.type, f.floor_name
+               FROM room r
+               LEFT JOIN floor f ON r.floor_no = f.floor_no
+               WHERE r.building_id = %s
+                 AND NOT EXISTS (SELECT 1 FROM room_reservation rr
+                                 WHERE rr.room_no = r.room_no
+                                   AND rr.start_time > %s AND rr.start_time < %s
+                                   AND rr.end_time > %s)"""
+    params = [building_id, start - MAX_BOOKING_LEN, end, start]
+    if room_type:
+        query += " AND r.type = %s"
+        params.append(room_type)
+    query += " ORDER BY r.room_no"
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(query, tuple(params))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def _parse_weekday(value):
+    value = str(value).strip().lower()
+    if value.isdigit():
+        return int(value) % 7
+    return WEEKDAYS[value[:3]]
+
+
+def _parse_time(value):
+    return datetime.strptime(str(value).strip(), "%H:%M").time()
+
+
+def parse_timetable_csv(data):
+    """Weekly slots from CSV text/bytes with columns room_no, day, start, end[, purpose].
+
+    day is Mon..Sun or 0..6 (Monday = 0); times are HH:MM.
+    Returns (slots, errors) where errors are (line_no, message).
+    """
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig")
+    slots, errors = [], []
+    for line_no, row in enumerate(csv.DictReader(io.StringIO(data)), start=2):
+        try:
+            slots.append((int(row["room_no"]), _parse_weekday(row["day"]),
+                          _parse_time(row["start"]), _parse_time(row["end"]),
+                          (row.get("purpose") or "").strip() or None))
+        except (KeyError, ValueError) as e:
+            errors.append((line_no, f"invalid row: {e}"))
+    return slots, errors
+
+
+def expand_timetable(slots, semester_start, semester_end):
+    """Turn weekly slots into dated bookings for every week of the semester (inclusive)."""
+    bookings = []
+    for room_no, weekday, start_t, end_t, purpose in slots:
+        day = semester_start + timedelta(days=(weekday - semester_start.weekday()) % 7)
+        while day <= semester_end:
+            bookings.append((room_no, datetime.combine(day, start_t), datetime.combine(day, end_t), purpose))
+            day += timedelta(days=7)
+    return bookings
@@ -0,0 +1,109 @@
+# scope.py
+"""Role and row-level scope for the logged-in user.
+
+A user's rows in user_scope give their role and the departments and/or
+campuses they may see. Scope builds the SQL predicate for each kind of row
+once at login; pages splice them into their WHERE clauses so every query
+reads only the user's slice through the dept_id / campus_id indexes.
+"""
+
+ROLES = ("admin", "dept_head", "facility_manager", "user")
+ER_NO_SUCH_TABLE = 1146
+# Roles that only see their departments/campuses; with none left they see nothing.
+RESTRICTED_ROLES = ("dept_head", "facility_manager")
+
+# Predicate templates per row kind; {a} is the table alias used by the query.
+_DEPT_PREDICATES = {
+    "faculty": "{a}.dept_id IN ({ids})",
+    "room": "EXISTS (SELECT 1 FROM floor sf WHERE sf.floor_no = {a}.floor_no AND sf.dept_id IN ({ids}))",
+    "department": "{a}.dept_id IN ({ids})",
+    "campus": "EXISTS (SELECT 1 FROM floor sf WHERE sf.campus_id = {a}.campus_id AND sf.dept_id IN ({ids}))",
+}
+_CAMPUS_PREDICATES = {
+    "faculty": "EXISTS (SELECT 1 FROM room sr WHERE sr.room_no = {a}.room_no AND sr.campus_id IN ({ids}))",
+    "room": "{a}.campus_id IN ({ids})",
+    "department": "EXISTS (SELECT 1 FROM floor sf WHERE sf.dept_id = {a}.dept_id AND sf.campus_id IN ({ids}))",
+    "campus": "{a}.campus_id IN ({ids})",
+}
+
+
+class Scope:
+    """Precomputed row filters for one session."""
+
+    def __init__(self, role, dept_ids=(), campus_ids=()):
+        self.role = role
+        self.dept_ids = tuple(sorted(set(dept_ids)))
+        self.campus_ids = tuple(sorted(set(campus_ids)))
+        self._templates = {}
+        for kind in _DEPT_PREDICATES:
+            parts, params = [], []
+            if self.dept_ids:
+                parts.append(_DEPT_PREDICATES[kind].replace("{ids}", ",".join(["%s"] * len(self.dept_ids))))
+                params.extend(self.dept_ids)
+            if self.campus_ids:
+                parts.append(_CAMPUS_PREDICATES[kind].replace("{ids}", ",".join(["%s"] * len(self.campus_ids))))
+                params.extend(self.campus_ids)
+            if not parts:
+                self._templates[kind] = ("1=0" if role in RESTRICTED_ROLES else "1=1", ())
+            elif len(parts) == 1:
+                self._templates[kind] = (parts[0], tuple(params))
+            else:
+                self._templates[kind] = ("(" + " OR ".join(parts) + ")", tuple(params))
+
+    @property
+    def is_restricted(self):
+        return self.role in RESTRICTED_ROLES or bool(self.dept_ids or self.campus_ids)
+
+    def filter(self, kind, alias):
+        """(sql, params) restricting rows of kind ('faculty', 'room', 'department', 'campus')."""
+        sql, params = self._templates[kind]
+        return sql.replace("{a}", alias), params
+
+    def describe(self):
+        parts = []
+        if self.dept_ids:
+            parts.append("departments " + ", ".join(str(d) for d in self.dept_ids))
+        if self.campus_ids:
+            parts.append("campuses " + ", ".join(str(c) for c in self.campus_ids))
+        return "; ".join(parts) or ("no data" if self.role in RESTRICTED_ROLES else "all data")
+
+
+def load_scope(conn, username):
+    """Build the Scope for username from user_scope.
+
+    Users without user_scope rows keep the original rule: "admin" is an
+    unrestricted admin, everyone else an unrestricted read-only user. So
+    does every user when the table doesn't exist (schema predates scoping).
+    Any other error is raised: a restricted user must not get the
+    unrestricted default because their rows couldn't be read.
+
+    Rows survive the deletion of their department/campus with a NULL id
+    (ON DELETE SET NULL), so such a user keeps a restricted role with no
+    ids, which Scope turns into "1=0".
+    """
+    default = Scope("admin" if username == "admin" else "user")
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT role, dept_id, campus_id FROM user_scope WHERE username=%s", (username,))
+        rows = cursor.fetchall()
+    except Exception as e:
+        if getattr(e, "errno", None) == ER_NO_SUCH_TABLE:
+            return default
+        raise
+    finally:
+        cursor.close()
+    if not rows:
+        return default
+    roles = {r["role"] for r in rows if r["role"] in ROLES}
+    role = next((r for r in ROLES if r in roles), default.role)
+    return Scope(role,
+                 [r["dept_id"] for r in rows if r["dept_id"] is not None],
+                 [r["campus_id"] for r in rows if r["campus_id"] is not None])
+
+
+def session_scope(session_state):
+    """Scope stored at login; unrestricted if the session predates scoping."""
+    scope = session_state.get("scope")
+    if scope is None:
+        scope = Scope(session_state.get("role") or "user")
+    return scope
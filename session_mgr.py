@@ -0,0 +1,139 @@
+# session_mgr.py
+"""Bounded per-session UI state.
+
+Per-row UI flags (edit form open, delete pending) live in one small dict,
+session_state["_row_flags"] = {kind: {(flag, row_id): set_at}}, instead of a
+session key per row. Flags are dropped when their row is no longer listed,
+when the user moves to another page and after FLAG_TTL seconds.
+
+enforce() runs at the end of every rerun: it measures the session's state
+and, above UWMS_SESSION_BUDGET_MB, drops recomputable entries (largest
+first) so many long-lived sessions stay within a known memory bound.
+"""
+import logging
+import os
+import sys
+import time
+from array import array
+
+log = logging.getLogger("uwms.session")
+
+FLAG_TTL = float(os.environ.get("UWMS_FLAG_TTL", 1800))
+BUDGET_BYTES = int(float(os.environ.get("UWMS_SESSION_BUDGET_MB", 5)) * 1024 * 1024)
+
+# Entries that can be rebuilt (or lost) without breaking the session,
+# dropped largest first when the session is over budget.
+DROPPABLE = ("consistency_last", "fac_bulk_table", "room_bulk_table", "_rerun_ms", "_row_flags")
+# Resources, not data; counted shallowly.
+_SHALLOW = ("db_conn",)
+# Decided for the logged-in MySQL account; cleared when the account changes.
+ACCOUNT_KEYS = ("_replica_allowed", "_replica_wait", "_query_count")
+
+
+class RowFlags:
+    """Flags for the rows of one listing (kind = 'faculty', 'room', 'department', ...)."""
+
+    def __init__(self, session_state, kind):
+        self._flags = session_state.setdefault("_row_flags", {}).setdefault(kind, {})
+
+    def get(self, flag, row_id):
+        return (flag, row_id) in self._flags
+
+    def set(self, flag, row_id):
+        self._flags[(flag, row_id)] = time.time()
+
+    def clear(self, flag, row_id):
+        self._flags.pop((flag, row_id), None)
+
+    def toggle(self, flag, row_id):
+        if self.get(flag, row_id):
+            self.clear(flag, row_id)
+        else:
+            self.set(flag, row_id)
+
+    def retain(self, row_ids):
+        """Forget flags for rows that are not in row_ids (deleted or filtered out)."""
+        keep = set(row_ids)
+        for key in [k for k in self._flags if k[1] not in keep]:
+            del self._flags[key]
+
+
+def row_flags(session_state, kind):
+    return RowFlags(session_state, kind)
+
+
+def on_page(session_state, page):
+    """Row flags belong to the page that set them; drop them on navigation."""
+    if session_state.get("_page") != page:
+        session_state["_page"] = page
+        session_state.pop("_row_flags", None)
+
+
+def reset_account(session_state):
+    """Forget ACCOUNT_KEYS; called at login and logout."""
+    for key in ACCOUNT_KEYS:
+        session_state.pop(key, None)
+
+
+def expire_flags(session_state, now=None):
+    now = time.time() if now is None else now
+    for flags in (session_state.get("_row_flags") or {}).values():
+        for key in [k for k, set_at in flags.items() if now - set_at > FLAG_TTL]:
+            del flags[key]
+
+
+def compact_ids(values):
+    """Integer ids as a packed array (8 bytes each instead of a list of int objects)."""
+    return array("q", values)
+
+
+def sizeof(obj, _seen=None):
+    """Approximate deep size in bytes of a session_state value."""
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if hasattr(obj, "memory_usage") and hasattr(obj, "columns"):  # DataFrame
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, array):
+        return sys.getsizeof(obj, 0)
+    if hasattr(obj, "nbytes") and hasattr(obj, "dtype"):  # numpy array
+        return int(obj.nbytes)
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, dict):
+        size += sum(sizeof(k, seen) + sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)) or type(obj).__name__ == "deque":
+        size += sum(sizeof(v, seen) for v in obj)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += sizeof(vars(obj), seen)
+    return size
+
+
+def usage(session_state):
+    """{key: bytes} for this session, largest first."""
+    sizes = {}
+    for key in list(session_state.keys()):
+        value = session_state[key]
+        sizes[key] = sys.getsizeof(value, 0) if key in _SHALLOW else sizeof(value)
+    return dict(sorted(sizes.items(), key=lambda kv: kv[1], reverse=True))
+
+
+def enforce(session_state, budget=BUDGET_BYTES):
+    """Expire old flags, record the session's size and trim it to the budget.
+
+    Returns the size in bytes after trimming.
+    """
+    expire_flags(session_state)
+    sizes = usage(session_state)
+    total = sum(sizes.values())
+    if total > budget:
+        for key in sorted((k for k in DROPPABLE if k in sizes), key=sizes.get, reverse=True):
+            session_state.pop(key, None)
+            total -= sizes[key]
+            log.info("session over budget, dropped %s (%d bytes)", key, sizes[key])
+            if total <= budget:
+                break
+        if total > budget:
+            log.warning("session state %d bytes exceeds budget %d after trimming", total, budget)
+    session_state["_state_bytes"] = total
+    return total
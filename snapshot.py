@@ -0,0 +1,226 @@
+# snapshot.py
+"""Export/import the university dataset as a compact streamed archive.
+
+Format: a magic line followed by frames. Each frame is a 1-byte kind, a
+4-byte big-endian length and a zlib-compressed JSON payload:
+
+    T  table header   {"table": ..., "columns": [...]}
+    C  column chunk   [[values of column 0], [values of column 1], ...]
+    E  table end      {"rows": n}
+
+Chunks are columnar, so repeated values (ids, dates, types) compress well.
+Export reads every table inside one consistent-snapshot transaction and
+streams rows with fetchmany(). Import truncates the tables and bulk-loads
+them with multi-row INSERTs with FOREIGN_KEY_CHECKS off, so the
+department.dept_hod_id <-> faculty cycle needs no special ordering.
+
+Access control (user_scope) is opt-in on both sides: it is only exported
+with include_access=True, and only imported with include_access=True, so
+loading a snapshot never changes who can see what unless asked to.
+
+CLI (uses UWMS_SERVICE_USER / UWMS_SERVICE_PASSWORD):
+    python snapshot.py export prod.uwsnap [--include-access]
+    python snapshot.py import prod.uwsnap [--include-access]
+"""
+import argparse
+import json
+import struct
+import time
+import zlib
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import audit
+
+MAGIC = b"UWSNAP1\n"
+CHUNK_ROWS = 10000
+
+# Load order keeps trigger checks (faculty -> room) satisfied.
+SNAPSHOT_TABLES = ("campus", "block", "building", "department", "floor", "room",
+                   "faculty", "faculty_log", "asset_type", "asset", "room_reservation")
+ACCESS_TABLES = ("user_scope",)
+
+_FRAME = struct.Struct(">cI")
+
+
+def _default(o):
+    if isinstance(o, (datetime, date)):
+        return o.isoformat(sep=" ") if isinstance(o, datetime) else o.isoformat()
+    if isinstance(o, timedelta):
+        return str(o)
+    if isinstance(o, Decimal):
+        return str(o)
+    if isinstance(o, (bytes, bytearray)):
+        return int.from_bytes(o, "big")
+    raise TypeError(f"cannot snapshot value of type {type(o).__name__}")
+
+
+def _encode_column(values):
+    """Column values as JSON-ready list; the converter is picked once per column."""
+    sample = next((v for v in values if v is not None), None)
+    if sample is None or isinstance(sample, (int, float, str)):
+        return list(values)
+    if isinstance(sample, date) and not isinstance(sample, datetime):
+        return [None if v is None else v.isoformat() for v in values]
+    return [None if v is None else _default(v) for v in values]
+
+
+def _write_frame(out, kind, payload):
+    data = zlib.compress(json.dumps(payload, default=_default, separators=(",", ":")).encode("utf-8"), 6)
+    out.write(_FRAME.pack(kind, len(data)))
+    out.write(data)
+
+
+def _read_frames(inp):
+    if inp.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a snapshot file")
+    while True:
+        head = inp.read(_FRAME.size)
+        if not head:
+            return
+        if len(head) < _FRAME.size:
+            raise ValueError("truncated snapshot")
+        kind, length = _FRAME.unpack(head)
+        data = inp.read(length)
+        if len(data) < length:
+            raise ValueError("truncated snapshot")
+        yield kind, json.loads(zlib.decompress(data))
+
+
+def _existing_tables(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = DATABASE()")
+        return {r[0].lower() for r in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def export_snapshot(conn, out, tables=SNAPSHOT_TABLES, chunk_rows=CHUNK_ROWS, include_access=False):
+    """Stream the tables into the binary file object out. Returns {table: rows}."""
+    present = _existing_tables(conn)
+    if include_access:
+        tables = tuple(tables) + ACCESS_TABLES
+    counts = {}
+    out.write(MAGIC)
+    if conn.in_transaction:
+        conn.commit()
+    conn.start_transaction(consistent_snapshot=True, readonly=True)
+    try:
+        for table in tables:
+            if table not in present:
+                continue
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"SELECT * FROM `{table}`")
+                _write_frame(out, b"T", {"table": table, "columns": list(cursor.column_names)})
+                n = 0
+                while True:
+                    rows = cursor.fetchmany(chunk_rows)
+                    if not rows:
+                        break
+                    _write_frame(out, b"C", [_encode_column(col) for col in zip(*rows)])
+                    n += len(rows)
+                _write_frame(out, b"E", {"rows": n})
+                counts[table] = n
+            finally:
+                cursor.close()
+    finally:
+        conn.commit()
+    return counts
+
+
+def import_snapshot(conn, inp, insert_rows=1000, include_access=False):
+    """Replace the tables in the archive with its contents. Returns {table: rows}.
+
+    Access tables in the archive are skipped unless include_access is set.
+    Not atomic: each table is truncated and committed as it is loaded.
+    """
+    present = _existing_tables(conn)
+    allowed = SNAPSHOT_TABLES + (ACCESS_TABLES if include_access else ())
+    counts = {}
+    cursor = conn.cursor()
+    try:
+        if conn.in_transaction:
+            conn.commit()
+        cursor.execute("SET FOREIGN_KEY_CHECKS=0")
+        cursor.execute("SET UNIQUE_CHECKS=0")
+        cursor.execute("SET @uwms_skip_change_log=1")  # replicas reload in full instead
+        table = insert_sql = None
+        for kind, payload in _read_frames(inp):
+            if kind == b"T":
+                table = payload["table"]
+                if table in ACCESS_TABLES and not include_access:
+                    table = None  # skip its chunks
+                    continue
+                if table not in allowed or table not in present:
+                    raise ValueError(f"unexpected table in snapshot: {table}")
+                cols = ", ".join(f"`{c}`" for c in payload["columns"])
+                marks = ", ".join(["%s"] * len(payload["columns"]))
+                insert_sql = f"INSERT INTO `{table}` ({cols}) VALUES ({marks})"
+                cursor.execute(f"TRUNCATE TABLE `{table}`")
+                counts[table] = 0
+            elif table is None:
+                continue
+            elif kind == b"C":
+                rows = list(zip(*payload))
+                for i in range(0, len(rows), insert_rows):
+                    cursor.executemany(insert_sql, rows[i:i + insert_rows])
+                counts[table] += len(rows)
+            elif kind == b"E":
+                conn.commit()
+                if counts[table] != payload["rows"]:
+                    raise ValueError(f"{table}: expected {payload['rows']} rows, loaded {counts[table]}")
+        if "asset" in counts and "asset_room_count" in present:
+            # triggers counted every loaded asset on top of stale totals; rebuild
+            cursor.execute("TRUNCATE TABLE asset_room_count")
+            cursor.execute("""INSERT INTO asset_room_count (room_no, type_id, asset_count)
+                              SELECT room_no, type_id, COUNT(*) FROM asset
+                              WHERE room_no IS NOT NULL GROUP BY room_no, type_id""")
+        if "change_log" in present:
+            cursor.execute("INSERT INTO change_log (table_name, row_id) VALUES ('*', 0)")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        try:
+            cursor.execute("SET FOREIGN_KEY_CHECKS=1")
+            cursor.execute("SET UNIQUE_CHECKS=1")
+            cursor.execute("SET @uwms_skip_change_log=NULL")
+        finally:
+            cursor.close()
+    audit.record_now(conn, audit.summary_event("IMPORT", "*", getattr(conn, "user", None), "snapshot import",
+                                               sum(counts.values()), counts))
+    return counts
+
+
+def main():
+    from db import connect_service
+    parser = argparse.ArgumentParser(description="Export or import a university dataset snapshot")
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument("path")
+    parser.add_argument("--include-access", action="store_true",
+                        help="also export/import user_scope (replaces the target's access control)")
+    args = parser.parse_args()
+
+    conn = connect_service()
+    if conn is None:
+        raise SystemExit("Set UWMS_SERVICE_USER and UWMS_SERVICE_PASSWORD")
+    start = time.perf_counter()
+    try:
+        if args.action == "export":
+            with open(args.path, "wb") as f:
+                counts = export_snapshot(conn, f, include_access=args.include_access)
+        else:
+            with open(args.path, "rb") as f:
+                counts = import_snapshot(conn, f, include_access=args.include_access)
+    finally:
+        conn.close()
+    for table, n in counts.items():
+        print(f"{table}: {n} rows")
+    print(f"{args.action} finished in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
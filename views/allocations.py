@@ -0,0 +1,49 @@
+# views/allocations.py
+import streamlit as st
+
+from db import execute_query, show_db_error
+from lookups import get_available_rooms
+
+# -------------------------
+# Allocations
+# -------------------------
+def show_allocations():
+    if st.session_state.role != "admin":
+        st.error("❌ Access Denied — Admin only")
+        return
+
+    st.header("📋 Room Allocations")
+    available = get_available_rooms()
+    faculty_no_room = execute_query("SELECT faculty_id, faculty_name FROM faculty WHERE room_no IS NULL ORDER BY faculty_name")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if faculty_no_room:
+            fdict = {f"{r['faculty_name']} (ID {r['faculty_id']})": r['faculty_id'] for r in faculty_no_room}
+            sel_fac = st.selectbox("Select Faculty", ["Select Faculty"] + list(fdict.keys()), key="alloc_fac")
+        else:
+            st.info("All faculty have rooms")
+            sel_fac = None
+    with col2:
+        if available:
+            sel_room = st.selectbox("Select Room", ["Select Room"] + [str(r) for r in available], key="alloc_room")
+        else:
+            st.info("No available rooms")
+            sel_room = None
+
+    if st.button("Allocate Room"):
+        if not sel_fac or sel_fac == "Select Faculty" or not sel_room or sel_room == "Select Room":
+            st.error("Select both faculty and room")
+        else:
+            faculty_id = fdict[sel_fac]
+            room_no = int(sel_room)
+            try:
+                ok1 = execute_query("UPDATE faculty SET room_no=%s WHERE faculty_id=%s", (room_no, faculty_id), fetch=False)
+                ok2 = execute_query("UPDATE room SET is_allotted=1 WHERE room_no=%s", (room_no,), fetch=False)
+                if ok1 and ok2:
+                    st.success("✅ Room allocated")
+                    st.session_state._last_action += 1
+                else:
+                    st.error("Allocation failed")
+            except Exception as e:
+                show_db_error(e)
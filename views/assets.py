@@ -0,0 +1,121 @@
+# views/assets.py
+import streamlit as st
+import pandas as pd
+from datetime import date
+
+import assets
+from db import execute_query, execute_many, execute_transaction, in_clause
+from scope import session_scope
+
+
+def get_asset_types():
+    rows = execute_query("SELECT type_id, type_name FROM asset_type ORDER BY type_id", cached=True)
+    return {r['type_name']: r['type_id'] for r in rows} if rows else {}
+
+
+def _existing_tags(tags, chunk_size=1000):
+    """Tags already registered, looked up through the unique index in chunks."""
+    found = set()
+    for i in range(0, len(tags), chunk_size):
+        chunk = tags[i:i + chunk_size]
+        rows = execute_query(f"SELECT asset_tag FROM asset WHERE asset_tag IN ({in_clause(chunk)})", tuple(chunk))
+        found.update(r['asset_tag'] for r in rows or [])
+    return found
+
+
+# -------------------------
+# Assets
+# -------------------------
+def show_assets():
+    if st.session_state.role != "admin":
+        st.error("❌ Access Denied — Admin only")
+        return
+
+    st.header("🖥️ Asset Tracking")
+    type_map = get_asset_types()
+    tab1, tab2, tab3, tab4 = st.tabs(["Inventory", "Room Lookup", "Register", "Move"])
+
+    with tab1:
+        level = st.selectbox("Roll up by", assets.ROLLUP_LEVELS, index=2, key="asset_rollup_level")
+        room_where, room_params = session_scope(st.session_state).filter("room", "r")
+        rows = execute_query(assets.rollup_query(level, room_where), room_params, cached=True)
+        if rows:
+            df = pd.DataFrame(rows)
+            keys = [c for c in df.columns if c not in ("type_name", "assets")]
+            pivot = df.pivot_table(index=keys, columns="type_name", values="assets", aggfunc="sum", fill_value=0)
+            pivot["Total"] = pivot.sum(axis=1)
+            st.dataframe(pivot.reset_index(), use_container_width=True)
+        else:
+            st.info("No assets registered")
+        unassigned = execute_query("SELECT COUNT(*) AS c FROM asset WHERE room_no IS NULL", cached=True)
+        st.caption(f"Not in any room: {unassigned[0]['c'] if unassigned else 0}")
+
+    with tab2:
+        room_no = st.number_input("Room Number", min_value=1, step=1, key="asset_lookup_room")
+        rows = execute_query(assets.ROOM_ASSETS_SQL, (int(room_no),), cached=True)
+        if rows:
+            df = pd.DataFrame(rows)
+            df['status'] = df['status'].map(assets.STATUSES)
+            st.dataframe(df, use_container_width=True)
+        else:
+            st.info("No assets in this room")
+
+    with tab3:
+        with st.form("add_asset_form"):
+            tag = st.text_input("Asset Tag *", key="asset_tag")
+            type_name = st.selectbox("Type *", list(type_map.keys()), key="asset_type")
+            room_text = st.text_input("Room Number (optional)", key="asset_room")
+            fac_text = st.text_input("Faculty ID (optional)", key="asset_faculty")
+            status = st.selectbox("Status", list(assets.STATUSES.keys()), format_func=assets.STATUSES.get,
+                                  key="asset_status")
+            if st.form_submit_button("Register Asset"):
+                if not tag or not type_name:
+                    st.error("Asset tag and type required")
+                elif (room_text and not room_text.isdigit()) or (fac_text and not fac_text.isdigit()):
+                    st.error("Room number and faculty ID must be numbers")
+                else:
+                    ok = execute_query(assets.INSERT_SQL,
+                                       (tag.strip(), type_map[type_name], int(room_text) if room_text else None,
+                                        int(fac_text) if fac_text else None, status, date.today()),
+                                       fetch=False)
+                    if ok:
+                        st.success(f"✅ Asset {tag} registered")
+                        st.session_state._last_action += 1
+
+        st.markdown("**Bulk registration**")
+        st.caption("CSV columns: asset_tag, type (name or id), room_no, faculty_id, status (1-4)")
+        upload = st.file_uploader("Assets CSV", type=["csv"], key="asset_upload")
+        if st.button("Import Assets", key="asset_import"):
+            if upload is None:
+                st.error("Choose a CSV file")
+            else:
+                rows, errors = assets.parse_asset_csv(upload.getvalue(), type_map)
+                existing = _existing_tags([r[0] for r in rows])
+                if existing:
+                    errors.append((None, f"{len(existing)} tag(s) already registered and skipped"))
+                    rows = [r for r in rows if r[0] not in existing]
+                for line_no, msg in errors[:20]:
+                    st.warning(f"Line {line_no}: {msg}" if line_no else msg)
+                if rows:
+                    written = execute_many(assets.INSERT_SQL, rows)
+                    if written is not None:
+                        st.success(f"✅ Registered {written} asset(s)")
+                        st.session_state._last_action += 1
+
+    with tab4:
+        tags_text = st.text_area("Asset tags (one per line or comma separated)", key="asset_move_tags")
+        target = st.text_input("Target room (blank = storage)", key="asset_move_room")
+        if st.button("Move Assets", key="asset_move"):
+            tags = [t.strip() for t in tags_text.replace(",", "\n").splitlines() if t.strip()]
+            if not tags:
+                st.error("Enter at least one asset tag")
+            elif target and not target.isdigit():
+                st.error("Room number must be a number")
+            else:
+                counts = execute_transaction([
+                    (f"UPDATE asset SET room_no=%s WHERE asset_tag IN ({in_clause(tags)})",
+                     (int(target) if target else None,) + tuple(tags)),
+                ])
+                if counts is not None:
+                    st.success(f"✅ Moved {counts[0]} asset(s)")
+                    st.session_state._last_action += 1
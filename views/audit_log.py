@@ -0,0 +1,57 @@
+# views/audit_log.py
+import streamlit as st
+import pandas as pd
+from datetime import date, datetime, time, timedelta
+
+from db import execute_query, get_audit_writer
+
+AUDIT_TABLES = ["All", "faculty", "room", "department", "campus", "block", "building", "floor",
+                "room_reservation", "asset", "asset_type", "*"]
+
+# -------------------------
+# Audit Log
+# -------------------------
+def show_audit_log():
+    if st.session_state.role != "admin":
+        st.error("❌ Access Denied — Admin only")
+        return
+
+    st.header("🧾 Audit Log")
+    writer = get_audit_writer()
+    if writer is None:
+        st.caption("Events are written at the end of each page run (no background writer configured).")
+    else:
+        st.caption(f"Background writer: {writer.written} written, {writer.pending()} pending, {writer.dropped} dropped")
+        if writer.last_error:
+            st.warning(f"Last flush failed: {writer.last_error}")
+
+    c1, c2, c3, c4 = st.columns(4)
+    with c1:
+        from_day = st.date_input("From", value=date.today() - timedelta(days=7), key="audit_from")
+    with c2:
+        to_day = st.date_input("To", value=date.today(), key="audit_to")
+    with c3:
+        table = st.selectbox("Table", AUDIT_TABLES, key="audit_table")
+    with c4:
+        user = st.text_input("User", key="audit_user")
+
+    # The event_time range lets MySQL prune to the months asked for
+    where = ["event_time >= %s", "event_time < %s"]
+    params = [datetime.combine(from_day, time(0, 0)), datetime.combine(to_day + timedelta(days=1), time(0, 0))]
+    if table != "All":
+        where.append("table_name = %s")
+        params.append(table)
+    if user:
+        where.append("username = %s")
+        params.append(user)
+    rows = execute_query(f"""
+        SELECT event_time, username, action, table_name, row_count, statement, before_values, after_values
+        FROM audit_log
+        WHERE {' AND '.join(where)}
+        ORDER BY event_time DESC
+        LIMIT 500
+    """, tuple(params))
+    if rows:
+        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+    else:
+        st.info("No audit events in that range")
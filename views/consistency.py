@@ -0,0 +1,75 @@
+# views/consistency.py
+import streamlit as st
+import pandas as pd
+
+import consistency
+from db import get_query_cache, show_db_error
+from jobs import start_background_jobs
+from session_mgr import compact_ids
+
+# -------------------------
+# Allocation consistency
+# -------------------------
+def show_consistency():
+    if st.session_state.role != "admin":
+        st.error("❌ Access Denied — Admin only")
+        return
+
+    st.header("🩺 Allocation Consistency")
+    st.caption("Compares room.is_allotted with faculty.room_no. Faculty assignments are treated as correct.")
+
+    job = start_background_jobs().get("consistency")
+    if job is None:
+        st.info("Scheduled checks are off. Set UWMS_SERVICE_USER / UWMS_SERVICE_PASSWORD to enable them.")
+    else:
+        st.write(f"Scheduled every {job.interval / 60:.0f} min (repair {'on' if job.do_repair else 'off'}).")
+        if job.last_error:
+            st.warning(f"Last scheduled run failed: {job.last_error}")
+
+    conn = st.session_state.get("db_conn")
+    col1, col2 = st.columns(2)
+    with col1:
+        batch_size = st.number_input("Repair batch size", min_value=1, value=consistency.DEFAULT_BATCH_SIZE,
+                                     step=100, key="consistency_batch")
+    with col2:
+        do_repair = st.checkbox("Repair mismatches", key="consistency_repair")
+
+    if st.button("Run check now", key="consistency_run"):
+        try:
+            summary = consistency.run_check(conn, do_repair, int(batch_size))
+            if summary["repaired"]:
+                get_query_cache().invalidate_tables({"room"})
+            for key in ("allotted_unused", "free_but_used", "shared"):
+                summary[key] = compact_ids(summary[key])
+            st.session_state["consistency_last"] = summary
+            st.session_state._last_action += 1
+        except Exception as e:
+            show_db_error(e)
+
+    summary = st.session_state.get("consistency_last")
+    if summary:
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Rooms scanned", summary["rooms_scanned"])
+        c2.metric("Allotted, no faculty", len(summary["allotted_unused"]))
+        c3.metric("Free, but assigned", len(summary["free_but_used"]))
+        c4.metric("Shared rooms", len(summary["shared"]))
+        if summary["repaired"]:
+            st.success(f"✅ Repaired {summary['repaired']} room(s)")
+        for label, key in (("Allotted without faculty", "allotted_unused"),
+                           ("Free but assigned", "free_but_used"),
+                           ("Shared by several faculty (fix manually)", "shared")):
+            if summary[key]:
+                st.write(f"**{label}:** {', '.join(str(r) for r in summary[key][:200])}"
+                         + (" …" if len(summary[key]) > 200 else ""))
+
+    st.markdown("---")
+    st.subheader("Recent Runs")
+    try:
+        runs = consistency.recent_runs(conn)
+    except Exception as e:
+        show_db_error(e)
+        runs = []
+    if runs:
+        st.dataframe(pd.DataFrame(runs), use_container_width=True)
+    else:
+        st.info("No runs recorded yet")
@@ -0,0 +1,77 @@
+# views/dashboard.py
+import streamlit as st
+import pandas as pd
+
+from db import execute_query
+from scope import session_scope
+
+# -------------------------
+# Dashboard
+# -------------------------
+def get_statistics():
+    stats = {"faculty": 0, "rooms": 0, "allocated": 0, "available": 0, "departments": 0, "campuses": 0}
+    scope = session_scope(st.session_state)
+    fac_where, fac_params = scope.filter("faculty", "f")
+    room_where, room_params = scope.filter("room", "r")
+    dept_where, dept_params = scope.filter("department", "d")
+    campus_where, campus_params = scope.filter("campus", "c")
+    try:
+        r = execute_query(f"SELECT COUNT(*) AS c FROM faculty f WHERE {fac_where}", fac_params, cached=True, replica=True)
+        stats['faculty'] = r[0]['c'] if r else 0
+    except:
+        stats['faculty'] = 0
+    try:
+        r = execute_query(f"SELECT COUNT(*) AS c FROM room r WHERE {room_where}", room_params, cached=True, replica=True)
+        stats['rooms'] = r[0]['c'] if r else 0
+    except:
+        stats['rooms'] = 0
+    try:
+        r = execute_query(f"SELECT COUNT(*) AS c FROM room r WHERE r.is_allotted=1 AND {room_where}", room_params, cached=True, replica=True)
+        stats['allocated'] = r[0]['c'] if r else 0
+    except:
+        stats['allocated'] = 0
+    try:
+        r = execute_query(f"SELECT COUNT(*) AS c FROM room r WHERE r.is_allotted=0 AND {room_where}", room_params, cached=True, replica=True)
+        stats['available'] = r[0]['c'] if r else 0
+    except:
+        stats['available'] = 0
+    try:
+        r = execute_query(f"SELECT COUNT(*) AS c FROM department d WHERE {dept_where}", dept_params, cached=True, replica=True)
+        stats['departments'] = r[0]['c'] if r else 0
+    except:
+        stats['departments'] = 0
+    try:
+        r = execute_query(f"SELECT COUNT(*) AS c FROM campus c WHERE {campus_where}", campus_params, cached=True, replica=True)
+        stats['campuses'] = r[0]['c'] if r else 0
+    except:
+        stats['campuses'] = 0
+    return stats
+
+
+def show_dashboard():
+    st.header("📊 Dashboard Overview")
+    stats = get_statistics()
+
+    c1, c2, c3, c4, c5, c6 = st.columns(6)
+    c1.metric("Total Faculty", stats['faculty'])
+    c2.metric("Total Rooms", stats['rooms'])
+    c3.metric("Allocated", stats['allocated'])
+    c4.metric("Available", stats['available'])
+    c5.metric("Departments", stats['departments'])
+    c6.metric("Campuses", stats['campuses'])
+
+    st.markdown("---")
+    st.subheader("📌 Recent Allocations")
+    fac_where, fac_params = session_scope(st.session_state).filter("faculty", "f")
+    allocs = execute_query(f"""
+        SELECT f.faculty_id, f.faculty_name, f.post, f.room_no, d.dept_name
+        FROM faculty f LEFT JOIN department d ON f.dept_id=d.dept_id
+        WHERE f.room_no IS NOT NULL AND {fac_where}
+        ORDER BY f.faculty_id DESC
+        LIMIT 10
+    """, fac_params, cached=True, replica=True)
+    if allocs:
+        df = pd.DataFrame(allocs)
+        st.dataframe(df, use_container_width=True)
+    else:
+        st.info("No recent allocations")
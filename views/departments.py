@@ -0,0 +1,164 @@
+# views/departments.py
+import streamlit as st
+import pandas as pd
+
+from db import execute_query, show_db_error
+from scope import session_scope
+from session_mgr import row_flags
+
+# -------------------------
+# Departments
+# -------------------------
+def show_departments():
+    if st.session_state.role != "admin":
+        st.error("❌ Access Denied — Admin only")
+        return
+
+    st.header("🏛️ Departments")
+    dept_where, dept_params = session_scope(st.session_state).filter("department", "d")
+    depts = execute_query(f"""
+        SELECT d.dept_id, d.dept_name, f.faculty_name as hod_name,
+               (SELECT COUNT(*) FROM faculty WHERE dept_id=d.dept_id) as faculty_count
+        FROM department d
+        LEFT JOIN faculty f ON d.dept_hod_id = f.faculty_id
+        WHERE {dept_where}
+        ORDER BY d.dept_id
+    """, dept_params, replica=True)
+    if depts:
+        st.dataframe(pd.DataFrame(depts), use_container_width=True)
+    else:
+        st.info("No departments found")
+
+    # Manage list (edit/delete inline)
+    flags = row_flags(st.session_state, "department")
+    flags.retain(rec['dept_id'] for rec in depts or [])
+    if depts:
+        for rec in depts:
+            dept_id = rec['dept_id']
+            cols = st.columns([3,1,1])
+            with cols[0]:
+                st.markdown(f"**{rec['dept_name']}**  \nHOD: {rec['hod_name'] or 'None'}  \nFaculty Count: {rec['faculty_count']}")
+            with cols[1]:
+                if st.button("✏️ Edit", key=f"edit_dept_{dept_id}"):
+                    flags.toggle("edit", dept_id)
+                    st.session_state._last_action += 1
+            with cols[2]:
+                if st.button("🗑️ Delete", key=f"del_dept_{dept_id}"):
+                    flags.set("delete", dept_id)
+                    st.session_state._last_action += 1
+
+            # Confirm delete UI
+            if flags.get("delete", dept_id):
+                st.warning(f"Are you sure you want to delete Department **{rec['dept_name']}**? This cannot be undone.")
+                c1, c2 = st.columns(2)
+                with c1:
+                    if st.button("Confirm Delete", key=f"confirm_del_dept_yes_{dept_id}"):
+                        try:
+                            ok = execute_query("DELETE FROM department WHERE dept_id=%s", (dept_id,), fetch=False)
+                            if ok:
+                                st.success(f"✅ Department {rec['dept_name']} deleted.")
+                                flags.clear("delete", dept_id)
+                                st.session_state._last_action += 1
+                                st.rerun()
+                            else:
+                                st.error("Failed to delete department")
+                        except Exception as e:
+                            show_db_error(e)
+                with c2:
+                    if st.button("Cancel", key=f"confirm_del_dept_no_{dept_id}"):
+                        flags.clear("delete", dept_id)
+                        st.info("Cancelled deletion.")
+                        st.session_state._last_action += 1
+
+            # Edit form
+            if flags.get("edit", dept_id):
+                with st.expander(f"Edit Department {rec['dept_name']}", expanded=True):
+                    fresh = execute_query("SELECT * FROM department WHERE dept_id=%s", (dept_id,))
+                    if not fresh:
+                        st.error("Department not found")
+                    else:
+                        fresh = fresh[0]
+                        with st.form(key=f"edit_dept_form_{dept_id}"):
+                            new_name = st.text_input("Department Name", value=fresh.get('dept_name') or "", key=f"dept_name_{dept_id}")
+
+                            # Professors/faculty who are not HODs anywhere (backend logic)
+                            professors = execute_query("""
+                                SELECT f.faculty_id, f.faculty_name
+                                FROM faculty f
+                                WHERE f.faculty_id NOT IN (
+                                    SELECT COALESCE(dept_hod_id, 0)
+                                    FROM department
+                                    WHERE dept_hod_id IS NOT NULL
+                                )
+                                ORDER BY f.faculty_name
+                            """)
+                            hod_options = ["None"] + [f"{p['faculty_id']} - {p['faculty_name']}" for p in professors] if professors else ["None"]
+
+                            # If the current HOD is set and not in the list (because it's the current dept's HOD),
+                            # include them in the options so the admin can keep the same HOD.
+                            current_hod_id = fresh.get('dept_hod_id')
+                            if current_hod_id:
+                                cur_hod = execute_query("SELECT faculty_id, faculty_name FROM faculty WHERE faculty_id=%s", (current_hod_id,))
+                                if cur_hod and len(cur_hod) > 0:
+                                    label = f"{cur_hod[0]['faculty_id']} - {cur_hod[0]['faculty_name']}"
+                                    if label not in hod_options:
+                                        hod_options.insert(1, label)  # insert after None
+
+                            hod_choice = st.selectbox("Select HOD (optional)", hod_options,
+                                                      index=0 if not fresh.get('dept_hod_id') else (hod_options.index(label) if fresh.get('dept_hod_id') and 'label' in locals() and label in hod_options else 0),
+                                                      key=f"dept_hod_select_{dept_id}")
+
+                            if st.form_submit_button("Save Changes", key=f"save_dept_{dept_id}"):
+                                if not new_name:
+                                    st.error("Department name required")
+                                else:
+                                    try:
+                                        hod_id = None if hod_choice == "None" else int(hod_choice.split(" - ")[0])
+                                        ok = execute_query("UPDATE department SET dept_name=%s, dept_hod_id=%s WHERE dept_id=%s",
+                                                           (new_name, hod_id, dept_id), fetch=False)
+                                        if ok:
+                                            st.success("✅ Department updated successfully")
+                                            flags.clear("edit", dept_id)
+                                            st.session_state._last_action += 1
+                                            st.rerun()
+                                        else:
+                                            st.error("Failed to update department")
+                                    except Exception as e:
+                                        show_db_error(e)
+
+    # Add Department block (with backend logic to show faculty not HODs)
+    st.markdown("---")
+    with st.expander("Add Department"):
+        with st.form("add_dept_form"):
+            dept_name = st.text_input("Department Name", key="new_dept_name")
+
+            # Fetch faculty who are NOT HOD of any other department
+            professors = execute_query("""
+                SELECT f.faculty_id, f.faculty_name
+                FROM faculty f
+                WHERE f.faculty_id NOT IN (
+                    SELECT COALESCE(dept_hod_id, 0)
+                    FROM department
+                    WHERE dept_hod_id IS NOT NULL
+                )
+                ORDER BY f.faculty_name
+            """)
+
+            hod_options = ["None"] + [f"{p['faculty_id']} - {p['faculty_name']}" for p in professors] if professors else ["None"]
+            hod_choice = st.selectbox("Select HOD (optional)", hod_options, key="new_dept_hod")
+
+            if st.form_submit_button("Add Department"):
+                if not dept_name:
+                    st.error("Department name required")
+                else:
+                    try:
+                        hod_id = None if hod_choice == "None" else int(hod_choice.split(" - ")[0])
+                        ok = execute_query("INSERT INTO department (dept_name, dept_hod_id) VALUES (%s,%s)", (dept_name, hod_id), fetch=False)
+                        if ok:
+                            st.success("✅ Department added")
+                            st.session_state._last_action += 1
+                            st.rerun()
+                        else:
+                            st.error("Failed to add department")
+                    except Exception as e:
+                        show_db_error(e)
@@ -0,0 +1,267 @@
+# views/faculty.py
+import streamlit as st
+import pandas as pd
+from datetime import date
+
+from db import execute_query, execute_transaction, in_clause, call_procedure, show_db_error
+from lookups import get_department_map, get_available_rooms
+from scope import session_scope
+from session_mgr import row_flags
+
+# -------------------------
+# Bulk faculty operations
+# -------------------------
+FACULTY_BULK_ACTIONS = ["Delete", "Change department", "Release rooms"]
+
+
+def faculty_bulk_statements(action, faculty_ids, dept_id=None):
+    """Set-based statements for one bulk action; the last one's rowcount is reported."""
+    ids = in_clause(faculty_ids)
+    params = tuple(faculty_ids)
+    # rooms of the selected faculty that nobody else holds (shared rooms stay allotted)
+    free_rooms = (f"""UPDATE room r SET r.is_allotted=0
+                      WHERE r.room_no IN (SELECT f.room_no FROM faculty f WHERE f.faculty_id IN ({ids}))
+                        AND NOT EXISTS (SELECT 1 FROM faculty o
+                                        WHERE o.room_no = r.room_no AND o.faculty_id NOT IN ({ids}))""",
+                  params + params)
+    if action == "Delete":
+        return [
+            (f"UPDATE department SET dept_hod_id=NULL WHERE dept_hod_id IN ({ids})", params),
+            free_rooms,
+            (f"DELETE FROM faculty WHERE faculty_id IN ({ids})", params),
+        ]
+    if action == "Change department":
+        return [
+            (f"UPDATE faculty SET dept_id=%s WHERE faculty_id IN ({ids})", (dept_id,) + params),
+        ]
+    if action == "Release rooms":
+        return [
+            free_rooms,
+            (f"UPDATE faculty SET room_no=NULL WHERE faculty_id IN ({ids}) AND room_no IS NOT NULL", params),
+        ]
+    raise ValueError(f"Unknown bulk action: {action}")
+
+
+def show_faculty_bulk_actions(filtered, dept_map):
+    """Selectable faculty table with set-based bulk actions."""
+    # result of the last action, kept across the st.rerun() that resets the table
+    done = st.session_state.pop("fac_bulk_result", None)
+    if done:
+        st.success(done)
+    edited = st.data_editor(filtered.assign(select=False), key="fac_bulk_table",
+                            use_container_width=True, hide_index=True,
+                            column_order=["select"] + list(filtered.columns),
+                            column_config={"select": st.column_config.CheckboxColumn("Select")},
+                            disabled=list(filtered.columns))
+    selected = [int(fid) for fid in edited.loc[edited["select"], "faculty_id"]]
+
+    with st.expander(f"Bulk Actions ({len(selected)} selected)", expanded=bool(selected)):
+        action = st.selectbox("Action", FACULTY_BULK_ACTIONS, key="fac_bulk_action")
+        dept_id = None
+        confirmed = True
+        if action == "Change department":
+            choice = st.selectbox("New department", ["Select Department"] + list(dept_map.keys()), key="fac_bulk_dept")
+            dept_id = dept_map.get(choice)
+        elif action == "Delete":
+            confirmed = st.checkbox(f"I understand {len(selected)} faculty record(s) will be deleted",
+                                    key="fac_bulk_confirm")
+
+        if st.button("Apply to selected", key="fac_bulk_apply"):
+            if not selected:
+                st.error("Select at least one faculty member in the table")
+            elif action == "Change department" and not dept_id:
+                st.error("Select a department")
+            elif not confirmed:
+                st.error("Please confirm the deletion")
+            else:
+                counts = execute_transaction(faculty_bulk_statements(action, selected, dept_id))
+                if counts is not None:
+                    st.session_state.fac_bulk_result = f"✅ {action}: {counts[-1]} faculty record(s) affected"
+                    st.session_state.pop("fac_bulk_table", None)
+                    st.session_state._last_action += 1
+                    st.rerun()
+
+# -------------------------
+# Faculty Management
+# -------------------------
+def show_faculty_management():
+    if st.session_state.role != "admin":
+        st.error("❌ Access Denied — Admin only")
+        return
+
+    st.header("👨‍🏫 Faculty Management")
+    tab1, tab2 = st.tabs(["View Faculty", "Add Faculty"])
+
+    with tab1:
+        st.subheader("All Faculty Members")
+        fac_where, fac_params = session_scope(st.session_state).filter("faculty", "f")
+        data = execute_query(f"""
+            SELECT f.faculty_id, f.faculty_name, f.post, d.dept_name, f.contact, f.date_of_join, f.room_no
+            FROM faculty f
+            LEFT JOIN department d ON f.dept_id = d.dept_id
+            WHERE {fac_where}
+            ORDER BY f.faculty_id
+        """, fac_params, replica=True)
+        if not data:
+            st.info("No faculty records found.")
+        else:
+            df = pd.DataFrame(data)
+            dept_map = get_department_map()
+            dept_options = ["All"] + list(dept_map.keys())
+            colf1, colf2 = st.columns(2)
+            with colf1:
+                dept_filter = st.selectbox("Filter by Department", dept_options, index=0)
+            with colf2:
+                search_name = st.text_input("Search name", key="fac_search")
+
+            # one boolean mask, one filtered frame (no intermediate copies)
+            mask = pd.Series(True, index=df.index)
+            if dept_filter and dept_filter != "All":
+                mask &= df['dept_name'] == dept_filter
+            if search_name:
+                mask &= df['faculty_name'].str.contains(search_name, case=False, na=False)
+            filtered = df[mask]
+
+            show_faculty_bulk_actions(filtered, dept_map)
+
+            flags = row_flags(st.session_state, "faculty")
+            flags.retain(filtered['faculty_id'])
+            st.markdown("**Faculty List**")
+            for rec in filtered.itertuples(index=False):
+                fid = rec.faculty_id
+                cols = st.columns([3, 2, 1, 1])
+                with cols[0]:
+                    st.markdown(f"**{rec.faculty_name}**  \n{rec.post}  \nDept: {rec.dept_name}")
+                with cols[1]:
+                    st.write(f"Contact: {rec.contact}")
+                with cols[2]:
+                    st.write(f"Room: {rec.room_no if rec.room_no else '—'}")
+                with cols[3]:
+                    if st.button("✏️ Edit", key=f"edit_{fid}"):
+                        flags.toggle("edit", fid)
+                        st.session_state._last_action += 1
+
+                    if st.button("🗑️ Delete", key=f"del_{fid}"):
+                        flags.set("delete", fid)
+                        st.session_state._last_action += 1
+
+                if flags.get("edit", fid):
+                    with st.expander(f"Edit {rec.faculty_name} (ID {fid})", expanded=True):
+                        fresh = execute_query("SELECT * FROM faculty WHERE faculty_id=%s", (fid,))
+                        if not fresh:
+                            st.error("Record not found")
+                        else:
+                            fresh = fresh[0]
+                            with st.form(key=f"edit_form_{fid}"):
+                                name = st.text_input("Name", value=fresh.get('faculty_name') or "", key=f"name_{fid}")
+                                post = st.selectbox("Post", ["Professor", "Associate Professor", "Assistant Professor", "Lecturer"],
+                                                    index=0, key=f"post_{fid}")
+                                dept_map_local = get_department_map()
+                                dept_list = ["Select Department"] + list(dept_map_local.keys())
+                                current_dept_name = None
+                                if fresh.get('dept_id'):
+                                    inv = {v: k for k, v in dept_map_local.items()}
+                                    current_dept_name = inv.get(fresh.get('dept_id'), None)
+                                dept_choice = st.selectbox("Department", dept_list,
+                                                           index=0 if not current_dept_name else dept_list.index(current_dept_name),
+                                                           key=f"dept_{fid}")
+                                contact = st.text_input("Contact", value=fresh.get('contact') or "", key=f"contact_{fid}")
+
+                                available = get_available_rooms()
+                                room_options = ["None"]
+                                cur_room = fresh.get('room_no')
+                                if cur_room:
+                                    room_options.insert(0, str(cur_room))
+                                room_options.extend([str(r) for r in available if str(r) not in room_options])
+                                room_choice = st.selectbox("Room", room_options, index=0, key=f"room_{fid}")
+
+                                if st.form_submit_button("Save Changes", key=f"save_{fid}"):
+                                    if not name or dept_choice == "Select Department":
+                                        st.error("Name and Department required")
+                                    else:
+                                        dept_id = dept_map_local.get(dept_choice)
+                                        new_room = None if room_choice == "None" else int(room_choice)
+                                        try:
+                                            ok = execute_query("""UPDATE faculty
+                                                                  SET faculty_name=%s, post=%s, contact=%s, dept_id=%s, room_no=%s
+                                                                  WHERE faculty_id=%s""",
+                                                               (name, post, contact, dept_id, new_room, fid),
+                                                               fetch=False)
+                                            if ok:
+                                                old_room = fresh.get('room_no')
+                                                if old_room and old_room != new_room:
+                                                    execute_query("UPDATE room SET is_allotted=0 WHERE room_no=%s", (old_room,), fetch=False)
+                                                if new_room:
+                                                    execute_query("UPDATE room SET is_allotted=1 WHERE room_no=%s", (new_room,), fetch=False)
+                                                st.success("✅ Faculty updated successfully")
+                                                flags.clear("edit", fid)
+                                                st.session_state._last_action += 1
+                                            else:
+                                                st.error("Failed to update faculty")
+                                        except Exception as e:
+                                            show_db_error(e)
+
+                if flags.get("delete", fid):
+                    st.warning(f"Are you sure you want to delete **{rec.faculty_name}** (ID {fid})? This cannot be undone.")
+                    c1, c2 = st.columns(2)
+                    with c1:
+                        if st.button("Confirm Delete", key=f"confirm_del_{fid}"):
+                            try:
+                                rec_room = execute_query("SELECT room_no FROM faculty WHERE faculty_id=%s", (fid,))
+                                room_no = rec_room[0]['room_no'] if rec_room and rec_room[0].get('room_no') else None
+                                ok = execute_query("DELETE FROM faculty WHERE faculty_id=%s", (fid,), fetch=False)
+                                if ok:
+                                    if room_no:
+                                        execute_query("UPDATE room SET is_allotted=0 WHERE room_no=%s", (room_no,), fetch=False)
+                                    st.success("✅ Faculty deleted")
+                                    flags.clear("delete", fid)
+                                    st.session_state._last_action += 1
+                                else:
+                                    st.error("Failed to delete")
+                            except Exception as e:
+                                show_db_error(e)
+                    with c2:
+                        if st.button("Cancel", key=f"cancel_del_{fid}"):
+                            flags.clear("delete", fid)
+                            st.session_state._last_action += 1
+
+    with tab2:
+        st.subheader("Add New Faculty")
+        with st.form("add_faculty_form"):
+            name = st.text_input("Faculty Name *", key="add_name")
+            post = st.selectbox("Post *", ["Professor", "Associate Professor", "Assistant Professor", "Lecturer"], key="add_post")
+            dept_map = get_department_map()
+            dept_list = ["Select Department"] + list(dept_map.keys())
+            dept_choice = st.selectbox("Department *", dept_list, key="add_dept")
+            contact = st.text_input("Contact (digits)", key="add_contact")
+            join_date = st.date_input("Date of Join", value=date.today(), key="add_join")
+            room_options = ["None"] + [str(r) for r in get_available_rooms()]
+            room_choice = st.selectbox("Assign Room (Optional)", room_options, key="add_room")
+            submitted = st.form_submit_button("Add Faculty")
+            if submitted:
+                if not name or dept_choice == "Select Department":
+                    st.error("Please fill required fields")
+                else:
+                    dept_id = dept_map.get(dept_choice)
+                    room_no = None if room_choice == "None" else int(room_choice)
+                    try:
+                        proc_result = call_procedure('add_faculty', [name, join_date, post, contact if contact else None, room_no, dept_id])
+                        if proc_result is not None:
+                            if room_no:
+                                execute_query("UPDATE room SET is_allotted=1 WHERE room_no=%s", (room_no,), fetch=False)
+                            st.success("✅ Faculty added successfully")
+                            for k in ("add_name", "add_contact", "add_room", "add_dept"):
+                                st.session_state.pop(k, None)
+                            st.session_state._last_action += 1
+                        else:
+                            ok = execute_query("INSERT INTO faculty (faculty_name, date_of_join, post, contact, room_no, dept_id) VALUES (%s,%s,%s,%s,%s,%s)",
+                                               (name, join_date, post, contact if contact else None, room_no, dept_id), fetch=False)
+                            if ok:
+                                if room_no:
+                                    execute_query("UPDATE room SET is_allotted=1 WHERE room_no=%s", (room_no,), fetch=False)
+                                st.success("✅ Faculty added successfully")
+                                st.session_state._last_action += 1
+                            else:
+                                st.error("Failed to add faculty")
+                    except Exception as e:
+                        show_db_error(e)
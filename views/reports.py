@@ -0,0 +1,32 @@
+# views/reports.py
+import streamlit as st
+import pandas as pd
+
+from db import execute_query
+from scope import session_scope
+
+# -------------------------
+# Reports (all users)
+# -------------------------
+def show_reports():
+    st.header("📈 Reports & Analytics")
+    scope = session_scope(st.session_state)
+    if scope.is_restricted:
+        st.caption(f"Showing {scope.describe()}")
+    fac_where, fac_params = scope.filter("faculty", "f")
+    report = execute_query(f"""
+        SELECT f.faculty_id, f.faculty_name, f.post, d.dept_name,
+               CASE WHEN f.room_no IS NULL THEN 'Not Allocated' ELSE 'Allocated' END as status,
+               f.room_no
+        FROM faculty f
+        LEFT JOIN department d ON f.dept_id = d.dept_id
+        WHERE {fac_where}
+        ORDER BY f.faculty_name
+    """, fac_params, cached=True, replica=True)
+    if report:
+        df = pd.DataFrame(report)
+        st.dataframe(df, use_container_width=True)
+        csv = df.to_csv(index=False)
+        st.download_button("📥 Download CSV", data=csv, file_name="faculty_report.csv", mime="text/csv")
+    else:
+        st.info("No data for reports")
@@ -0,0 +1,143 @@
+# views/reservations.py
+import streamlit as st
+import pandas as pd
+from datetime import date, datetime, time, timedelta
+
+import reservations
+from db import execute_query, get_query_cache, show_db_error
+from lookups import get_all_campuses, get_blocks_by_campus, get_buildings_by_block
+
+
+def _select_building(prefix):
+    """Campus → block → building selectors; returns building_id or None."""
+    campus_map = {c['campus_name']: c['campus_id'] for c in get_all_campuses()}
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        campus_id = campus_map.get(st.selectbox("Campus", ["Select Campus"] + list(campus_map.keys()),
+                                                key=f"{prefix}_campus"))
+    blocks = get_blocks_by_campus(campus_id) if campus_id else []
+    block_map = {b['block_name']: b['block_id'] for b in blocks}
+    with c2:
+        block_id = block_map.get(st.selectbox("Block", ["Select Block"] + list(block_map.keys()),
+                                              key=f"{prefix}_block"))
+    buildings = get_buildings_by_block(block_id) if block_id else []
+    building_map = {b['build_name']: b['building_id'] for b in buildings}
+    with c3:
+        return building_map.get(st.selectbox("Building", ["Select Building"] + list(building_map.keys()),
+                                             key=f"{prefix}_building"))
+
+
+def _select_slot(prefix):
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        day = st.date_input("Date", value=date.today(), key=f"{prefix}_date")
+    with c2:
+        start_t = st.time_input("From", value=time(10, 0), key=f"{prefix}_from")
+    with c3:
+        end_t = st.time_input("To", value=time(12, 0), key=f"{prefix}_to")
+    return datetime.combine(day, start_t), datetime.combine(day, end_t)
+
+
+# -------------------------
+# Reservations
+# -------------------------
+def show_reservations():
+    if st.session_state.role != "admin":
+        st.error("❌ Access Denied — Admin only")
+        return
+
+    st.header("🗓️ Room Reservations")
+    conn = st.session_state.get("db_conn")
+    tab1, tab2, tab3, tab4 = st.tabs(["Find Free Rooms", "Book Room", "Import Timetable", "Schedule"])
+
+    with tab1:
+        building_id = _select_building("free")
+        start, end = _select_slot("free")
+        room_type = st.selectbox("Room Type", ["Any", "Lab", "Lecture", "Office", "Conference Room"], key="free_type")
+        if st.button("Search", key="free_search"):
+            if not building_id:
+                st.error("Select a building")
+            elif end <= start:
+                st.error("End time must be after start time")
+            else:
+                try:
+                    rows = reservations.free_rooms(conn, building_id, start, end,
+                                                   None if room_type == "Any" else room_type)
+                    if rows:
+                        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+                    else:
+                        st.info("No free rooms in that slot")
+                except Exception as e:
+                    show_db_error(e)
+
+    with tab2:
+        with st.form("book_room_form"):
+            room_no = st.number_input("Room Number", min_value=1, step=1, key="book_room_no")
+            start, end = _select_slot("book")
+            purpose = st.text_input("Purpose", key="book_purpose")
+            if st.form_submit_button("Book"):
+                if end <= start:
+                    st.error("End time must be after start time")
+                else:
+                    try:
+                        ok, reason = reservations.book(conn, int(room_no), start, end, purpose or None,
+                                                       st.session_state.username)
+                        if ok:
+                            get_query_cache().invalidate_tables({"room_reservation"})
+                            st.success(f"✅ Room {room_no} booked")
+                            st.session_state._last_action += 1
+                        else:
+                            st.error(f"❌ Not booked: {reason}")
+                    except Exception as e:
+                        show_db_error(e)
+
+    with tab3:
+        st.caption("CSV columns: room_no, day (Mon..Sun), start (HH:MM), end (HH:MM), purpose. "
+                   "Each row repeats weekly between the semester dates.")
+        upload = st.file_uploader("Timetable CSV", type=["csv"], key="tt_upload")
+        c1, c2 = st.columns(2)
+        with c1:
+            sem_start = st.date_input("Semester start", value=date.today(), key="tt_start")
+        with c2:
+            sem_end = st.date_input("Semester end", value=date.today() + timedelta(weeks=16), key="tt_end")
+        if st.button("Import", key="tt_import"):
+            if upload is None:
+                st.error("Choose a CSV file")
+            elif sem_end < sem_start:
+                st.error("Semester end must be after its start")
+            else:
+                slots, errors = reservations.parse_timetable_csv(upload.getvalue())
+                for line_no, msg in errors[:20]:
+                    st.warning(f"Line {line_no}: {msg}")
+                bookings = reservations.expand_timetable(slots, sem_start, sem_end)
+                try:
+                    inserted, rejected = reservations.import_bookings(conn, bookings, st.session_state.username,
+                                                                      source="timetable")
+                    get_query_cache().invalidate_tables({"room_reservation"})
+                    st.success(f"✅ Imported {inserted} booking(s) from {len(slots)} weekly slot(s)")
+                    if rejected:
+                        st.warning(f"{len(rejected)} booking(s) skipped")
+                        st.dataframe(pd.DataFrame([{"room_no": b[0], "start": b[1], "end": b[2], "reason": reason}
+                                                   for b, reason in rejected[:500]]),
+                                     use_container_width=True)
+                    st.session_state._last_action += 1
+                except Exception as e:
+                    show_db_error(e)
+
+    with tab4:
+        building_id = _select_building("sched")
+        day = st.date_input("Day", value=date.today(), key="sched_day")
+        if building_id:
+            day_start = datetime.combine(day, time(0, 0))
+            rows = execute_query("""
+                SELECT rr.reservation_id, rr.room_no, rr.start_time, rr.end_time, rr.purpose, rr.booked_by
+                FROM room_reservation rr
+                JOIN room r ON rr.room_no = r.room_no
+                WHERE r.building_id = %s AND rr.start_time > %s AND rr.start_time < %s AND rr.end_time > %s
+                ORDER BY rr.room_no, rr.start_time
+            """, (building_id, day_start - reservations.MAX_BOOKING_LEN, day_start + timedelta(days=1), day_start),
+                cached=True)
+            if rows:
+                st.dataframe(pd.DataFrame(rows), use_container_width=True)
+            else:
+                st.info("No bookings that day")
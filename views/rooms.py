@@ -0,0 +1,328 @@
+# views/rooms.py
+import streamlit as st
+import pandas as pd
+
+from db import execute_query, execute_transaction, in_clause, show_db_error
+from lookups import (get_all_campuses, get_blocks_by_campus, get_buildings_by_block,
+                     get_floors_by_building, get_room_path, get_all_floors)
+from scope import session_scope
+from session_mgr import row_flags
+
+# -------------------------
+# Bulk room operations
+# -------------------------
+ROOM_BULK_ACTIONS = ["Delete", "Move to floor", "Change type", "Release"]
+
+
+def room_bulk_statements(action, room_nos, floor_no=None, room_type=None):
+    """Set-based statements for one bulk action; the last one's rowcount is reported."""
+    ids = in_clause(room_nos)
+    params = tuple(room_nos)
+    if action == "Delete":
+        return [
+            (f"UPDATE faculty SET room_no=NULL WHERE room_no IN ({ids})", params),
+            (f"DELETE FROM room WHERE room_no IN ({ids})", params),
+        ]
+    if action == "Move to floor":
+        return [
+            (f"""UPDATE room r JOIN floor f ON f.floor_no=%s
+                 SET r.floor_no=f.floor_no, r.building_id=f.building_id,
+                     r.block_id=f.block_id, r.campus_id=f.campus_id
+                 WHERE r.room_no IN ({ids})""", (floor_no,) + params),
+        ]
+    if action == "Change type":
+        return [
+            (f"UPDATE room SET type=%s WHERE room_no IN ({ids})", (room_type,) + params),
+        ]
+    if action == "Release":
+        return [
+            (f"UPDATE faculty SET room_no=NULL WHERE room_no IN ({ids})", params),
+            (f"UPDATE room SET is_allotted=0 WHERE room_no IN ({ids})", params),
+        ]
+    raise ValueError(f"Unknown bulk action: {action}")
+
+
+def show_room_bulk_actions(df):
+    """Room table with a select column and set-based bulk actions."""
+    # result of the last action, kept across the st.rerun() that resets the table
+    done = st.session_state.pop("room_bulk_result", None)
+    if done:
+        st.success(done)
+    edited = st.data_editor(df.assign(select=False), key="room_bulk_table",
+                            use_container_width=True, hide_index=True,
+                            column_order=["select"] + list(df.columns),
+                            column_config={"select": st.column_config.CheckboxColumn("Select")},
+                            disabled=list(df.columns))
+    selected = [int(rn) for rn in edited.loc[edited["select"], "room_no"]]
+
+    with st.expander(f"Bulk Actions ({len(selected)} selected)", expanded=bool(selected)):
+        action = st.selectbox("Action", ROOM_BULK_ACTIONS, key="room_bulk_action")
+        floor_no = room_type = None
+        confirmed = True
+        if action == "Move to floor":
+            floors = get_all_floors()
+            floor_map = {f"{f['path'] or f['floor_no']} (#{f['floor_no']})": f['floor_no'] for f in floors}
+            choice = st.selectbox("Target floor", ["Select Floor"] + list(floor_map.keys()), key="room_bulk_floor")
+            floor_no = floor_map.get(choice)
+        elif action == "Change type":
+            room_type = st.selectbox("New type", ["Lab", "Lecture", "Office", "Conference Room"], key="room_bulk_type")
+        elif action == "Delete":
+            confirmed = st.checkbox(f"I understand {len(selected)} room(s) will be deleted and their faculty unassigned",
+                                    key="room_bulk_confirm")
+
+        if st.button("Apply to selected", key="room_bulk_apply"):
+            if not selected:
+                st.error("Select at least one room in the table")
+            elif action == "Move to floor" and not floor_no:
+                st.error("Select a target floor")
+            elif not confirmed:
+                st.error("Please confirm the deletion")
+            else:
+                counts = execute_transaction(room_bulk_statements(action, selected, floor_no, room_type))
+                if counts is not None:
+                    st.session_state.room_bulk_result = f"✅ {action}: {counts[-1]} room(s) affected"
+                    st.session_state.pop("room_bulk_table", None)
+                    st.session_state._last_action += 1
+                    st.rerun()
+
+# -------------------------
+# Room Management
+# -------------------------
+def show_room_management():
+    if st.session_state.role != "admin":
+        st.error("❌ Access Denied — Admin only")
+        return
+
+    st.header("🏢 Room Management")
+
+    # ------------------------------
+    # Display existing rooms
+    # ------------------------------
+    room_where, room_params = session_scope(st.session_state).filter("room", "r")
+    rooms = execute_query(f"""
+        SELECT r.room_no, r.location, r.type, r.is_allotted,
+               f.floor_name, b.build_name, bl.block_name, c.campus_name
+        FROM room r
+        LEFT JOIN floor f ON r.floor_no = f.floor_no
+        LEFT JOIN building b ON r.building_id = b.building_id
+        LEFT JOIN block bl ON r.block_id = bl.block_id
+        LEFT JOIN campus c ON r.campus_id = c.campus_id
+        WHERE {room_where}
+        ORDER BY r.room_no
+    """, room_params, replica=True)
+
+    if rooms:
+        df = pd.DataFrame(rooms)
+        df['is_allotted'] = df['is_allotted'].apply(
+            lambda x: '✅ Allocated' if x and (x != 0) else '🟢 Available'
+        )
+        df['path'] = df['room_no'].apply(lambda rn: get_room_path(rn) or "")
+        show_room_bulk_actions(df)
+
+        flags = row_flags(st.session_state, "room")
+        flags.retain(df['room_no'])
+        st.markdown("**Manage Rooms**")
+        for rec in df.itertuples(index=False):
+            rn = rec.room_no
+            cols = st.columns([3,1,1])
+            with cols[0]:
+                st.markdown(f"**Room {rn}** — {rec.type} — {rec.location}  \n{rec.campus_name or ''} / {rec.block_name or ''} / {rec.build_name or ''} / {rec.floor_name or ''}")
+            with cols[1]:
+                if st.button("✏️ Edit", key=f"edit_room_{rn}"):
+                    flags.toggle("edit", rn)
+                    st.session_state._last_action += 1
+            with cols[2]:
+                if st.button("🗑️ Delete", key=f"del_room_{rn}"):
+                    flags.set("delete", rn)
+                    st.session_state._last_action += 1
+
+            # Confirm delete UI
+            if flags.get("delete", rn):
+                st.warning(f"Are you sure you want to delete Room **{rn}**? This cannot be undone.")
+                c1, c2 = st.columns(2)
+                with c1:
+                    if st.button("Confirm Delete", key=f"confirm_del_room_yes_{rn}"):
+                        try:
+                            ok = execute_query("DELETE FROM room WHERE room_no=%s", (rn,), fetch=False)
+                            if ok:
+                                st.success(f"✅ Room {rn} deleted.")
+                                flags.clear("delete", rn)
+                                st.session_state._last_action += 1
+                                st.rerun()
+                            else:
+                                st.error("Failed to delete room")
+                        except Exception as e:
+                            show_db_error(e)
+                with c2:
+                    if st.button("Cancel", key=f"confirm_del_room_no_{rn}"):
+                        flags.clear("delete", rn)
+                        st.info("Cancelled deletion.")
+                        st.session_state._last_action += 1
+
+            # Edit UI
+            if flags.get("edit", rn):
+                with st.expander(f"Edit Room {rn}", expanded=True):
+                    fresh = execute_query("SELECT * FROM room WHERE room_no=%s", (rn,))
+                    if not fresh:
+                        st.error("Room not found")
+                    else:
+                        fresh = fresh[0]
+                        with st.form(key=f"edit_room_form_{rn}"):
+                            # Provide campus/block/building/floor selectors but default to current values
+                            campuses = get_all_campuses()
+                            campus_map = {c['campus_name']: c['campus_id'] for c in campuses}
+                            current_campus_name = None
+                            if fresh.get('campus_id'):
+                                inv = {v:k for k,v in campus_map.items()}
+                                current_campus_name = inv.get(fresh.get('campus_id'))
+                            selected_campus = st.selectbox("Campus", ["Select Campus"] + list(campus_map.keys()),
+                                                           index=0 if not current_campus_name else (["Select Campus"] + list(campus_map.keys())).index(current_campus_name),
+                                                           key=f"edit_room_campus_{rn}")
+                            campus_id = campus_map.get(selected_campus)
+
+                            blocks = get_blocks_by_campus(campus_id) if campus_id else []
+                            block_map = {b['block_name']: b['block_id'] for b in blocks}
+                            current_block_name = None
+                            if fresh.get('block_id'):
+                                invb = {v:k for k,v in block_map.items()}
+                                current_block_name = invb.get(fresh.get('block_id'))
+                            selected_block = st.selectbox("Block", ["Select Block"] + list(block_map.keys()),
+                                                          index=0 if not current_block_name else (["Select Block"] + list(block_map.keys())).index(current_block_name),
+                                                          key=f"edit_room_block_{rn}")
+                            block_id = block_map.get(selected_block)
+
+                            buildings = get_buildings_by_block(block_id) if block_id else []
+                            building_map = {b['build_name']: b['building_id'] for b in buildings}
+                            current_building_name = None
+                            if fresh.get('building_id'):
+                                invbld = {v:k for k,v in building_map.items()}
+                                current_building_name = invbld.get(fresh.get('building_id'))
+                            selected_building = st.selectbox("Building", ["Select Building"] + list(building_map.keys()),
+                                                             index=0 if not current_building_name else (["Select Building"] + list(building_map.keys())).index(current_building_name),
+                                                             key=f"edit_room_building_{rn}")
+                            building_id = building_map.get(selected_building)
+
+                            floors = get_floors_by_building(building_id) if building_id else []
+                            floor_map = {f['floor_name']: f['floor_no'] for f in floors}
+                            current_floor_name = None
+                            if fresh.get('floor_no'):
+                                invfl = {v:k for k,v in floor_map.items()}
+                                current_floor_name = invfl.get(fresh.get('floor_no'))
+                            selected_floor = st.selectbox("Floor", ["Select Floor"] + list(floor_map.keys()),
+                                                          index=0 if not current_floor_name else (["Select Floor"] + list(floor_map.keys())).index(current_floor_name),
+                                                          key=f"edit_room_floor_{rn}")
+                            floor_no = floor_map.get(selected_floor)
+
+                            new_room_no = st.number_input("Room Number", min_value=1, value=int(fresh.get('room_no')), key=f"edit_room_no_{rn}")
+                            room_type = st.selectbox("Room Type", ["Lab", "Lecture", "Office", "Conference Room"],
+                                                     index=["Lab","Lecture","Office","Conference Room"].index(fresh.get('type')) if fresh.get('type') in ["Lab","Lecture","Office","Conference Room"] else 0,
+                                                     key=f"edit_room_type_{rn}")
+                            location = st.text_input("Location", value=fresh.get('location') or "", key=f"edit_room_location_{rn}")
+
+                            if st.form_submit_button("Save Changes", key=f"save_room_{rn}"):
+                                try:
+                                    ok = execute_query("""UPDATE room SET room_no=%s, location=%s, type=%s, floor_no=%s,
+                                                          block_id=%s, campus_id=%s, building_id=%s
+                                                          WHERE room_no=%s""",
+                                                       (int(new_room_no), location, room_type, int(floor_no) if floor_no else None,
+                                                        int(block_id) if block_id else None,
+                                                        int(campus_id) if campus_id else None,
+                                                        int(building_id) if building_id else None,
+                                                        rn),
+                                                       fetch=False)
+                                    if ok:
+                                        st.success("✅ Room updated successfully.")
+                                        flags.clear("edit", rn)
+                                        st.session_state._last_action += 1
+                                        st.rerun()
+                                    else:
+                                        st.error("Failed to update room")
+                                except Exception as e:
+                                    show_db_error(e)
+    else:
+        st.info("No rooms found")
+
+    st.markdown("---")
+    st.subheader("➕ Add New Room")
+
+    # ------------------------------
+    # Dropdowns for hierarchy (Add room)
+    # ------------------------------
+    campuses = get_all_campuses() or []
+    campus_map = {c['campus_name']: c['campus_id'] for c in campuses}
+
+    selected_campus = st.selectbox(
+        "Campus *", ["Select Campus"] + list(campus_map.keys()),
+        key="room_campus"
+    )
+    campus_id = campus_map.get(selected_campus)
+
+    blocks = get_blocks_by_campus(campus_id) if campus_id else []
+    block_map = {b['block_name']: b['block_id'] for b in blocks}
+
+    selected_block = st.selectbox(
+        "Block *", ["Select Block"] + list(block_map.keys()),
+        key="room_block"
+    )
+    block_id = block_map.get(selected_block)
+
+    buildings = get_buildings_by_block(block_id) if block_id else []
+    building_map = {b['build_name']: b['building_id'] for b in buildings}
+
+    selected_building = st.selectbox(
+        "Building *", ["Select Building"] + list(building_map.keys()),
+        key="room_building"
+    )
+    building_id = building_map.get(selected_building)
+
+    floors = get_floors_by_building(building_id) if building_id else []
+    floor_map = {f['floor_name']: f['floor_no'] for f in floors}
+
+    selected_floor = st.selectbox(
+        "Floor *", ["Select Floor"] + list(floor_map.keys()),
+        key="room_floor"
+    )
+    floor_no = floor_map.get(selected_floor)
+
+    room_no = st.number_input("Room Number *", min_value=1, step=1, value=1, key="room_no_add")
+    room_type = st.selectbox("Room Type *", ["Lab", "Lecture", "Office", "Conference Room"], key="room_type")
+
+    # ------------------------------
+    # Generate short location code
+    # ------------------------------
+    if selected_campus and selected_block and selected_building:
+        campus_short = selected_campus.split()[0][:2].upper()
+        block_short = selected_block.replace("Block", "").strip()[:1].upper()
+        building_short = selected_building.replace("Building", "").strip()[-1:]
+        location = f"{campus_short}-{block_short}{building_short}"
+    else:
+        location = None
+
+    # ------------------------------
+    # Insert into DB
+    # ------------------------------
+    if st.button("✅ Add Room"):
+        if not campus_id or not block_id or not building_id or not floor_no:
+            st.error("❌ Please select all dropdowns.")
+        elif room_no < 1:
+            st.error("❌ Room number must be at least 1")
+        elif not location:
+            st.error("❌ Could not generate location code. Check selections.")
+        else:
+            try:
+                result = execute_query(
+                    """INSERT INTO room 
+                       (room_no, location, type, is_allotted, floor_no, block_id, campus_id, building_id)
+                       VALUES (%s,%s,%s,b'0',%s,%s,%s,%s)""",
+                    (int(room_no), location, room_type,
+                     int(floor_no), int(block_id), int(campus_id), int(building_id)),
+                    fetch=False
+                )
+                if result:
+                    st.success(f"✅ Room {room_no} added successfully as {location}!")
+                    st.session_state._last_action += 1
+                    st.rerun()
+                else:
+                    st.error("❌ Failed to add room. Room number may already exist.")
+            except Exception as e:
+                show_db_error(e)
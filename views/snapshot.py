@@ -0,0 +1,62 @@
+# views/snapshot.py
+import io
+from datetime import datetime
+
+import streamlit as st
+
+import snapshot
+from db import get_query_cache, show_db_error
+
+# -------------------------
+# Snapshot export / import
+# -------------------------
+def show_snapshot():
+    if st.session_state.role != "admin":
+        st.error("❌ Access Denied — Admin only")
+        return
+
+    st.header("💾 Snapshot")
+    st.caption("Tables: " + ", ".join(snapshot.SNAPSHOT_TABLES)
+               + ". Access control (" + ", ".join(snapshot.ACCESS_TABLES) + ") only when included below. "
+               + "Audit log and consistency runs are not included. "
+               + "For large datasets use `python snapshot.py export|import FILE`.")
+    conn = st.session_state.get("db_conn")
+
+    st.subheader("Export")
+    export_access = st.checkbox("Include access control (user_scope)", key="snapshot_export_access")
+    if st.button("Build snapshot", key="snapshot_export"):
+        buf = io.BytesIO()
+        try:
+            counts = snapshot.export_snapshot(conn, buf, include_access=export_access)
+        except Exception as e:
+            show_db_error(e)
+        else:
+            st.write(", ".join(f"{t}: {n}" for t, n in counts.items()))
+            st.download_button("Download snapshot", buf.getvalue(),
+                               file_name=f"uwms_{datetime.now():%Y%m%d_%H%M}.uwsnap",
+                               mime="application/octet-stream", key="snapshot_download")
+
+    st.markdown("---")
+    st.subheader("Import")
+    st.warning("Import replaces every table in the snapshot. It is not reversible.")
+    upload = st.file_uploader("Snapshot file", type=["uwsnap"], key="snapshot_upload")
+    import_access = st.checkbox("Also replace access control (user_scope) from the snapshot",
+                                key="snapshot_import_access")
+    confirm = st.checkbox("I understand the current data will be replaced", key="snapshot_confirm")
+    if st.button("Import snapshot", key="snapshot_import"):
+        if upload is None:
+            st.error("Choose a snapshot file")
+        elif not confirm:
+            st.error("Confirm the import first")
+        else:
+            try:
+                counts = snapshot.import_snapshot(conn, io.BytesIO(upload.getvalue()),
+                                                  include_access=import_access)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+            except Exception as e:
+                show_db_error(e)
+            else:
+                get_query_cache().clear()
+                st.success("✅ Imported " + ", ".join(f"{t}: {n}" for t, n in counts.items()))
+                st.session_state._last_action += 1